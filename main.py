@@ -1,10 +1,11 @@
 import argparse
 import sys
 import os
-from dotenv import load_dotenv
 from src.orchestrator import LangGraphOrchestrator
+from src.utils.env import load_env
 
-load_dotenv()
+# Le .env n'est lu qu'une fois par processus (les agents réutilisent ce chargement)
+load_env()
 
 def main():
     parser = argparse.ArgumentParser()
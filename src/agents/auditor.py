@@ -3,138 +3,295 @@ Auditor Agent - Analyse le code et produit un plan de refactoring
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
+import re
 from pathlib import Path
-from typing import List, Dict
-import json
+from typing import List, Dict, Optional, Tuple
 
-from mistralai import Mistral
-from dotenv import load_dotenv
+import orjson
 
-from src.tools.file_operations import read_file, list_files
-from src.tools.analysis_tools import run_pylint
+from src.tools.file_operations import read_files, list_files
+from src.tools.analysis_tools import run_pylint_batch, pylint_version
+from src.utils.cache import get_cache, make_key
+from src.utils.env import get_env
+from src.utils.llm_clients import get_mistral_client
 from src.utils.logger import log_experiment, ActionType
+from src.utils.prompts import load_prompt
+
+# Premier bloc markdown (```json ... ``` ou ``` ... ```), fermeture optionnelle
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*(?:```|\Z)", re.DOTALL)
+
+# Au-delà de cette taille d'analyses sérialisées (~100k tokens), l'audit est découpé en plusieurs requêtes
+AUDIT_MAX_CHARS = 400_000
+
+# Durée de validité d'un plan mis en cache pour un répertoire inchangé (7 jours)
+PLAN_CACHE_TTL = 7 * 24 * 3600
+
 
 class AuditorAgent:
     """
     Agent responsable de l'audit du code source
     """
     
-    def __init__(self, model_name: str = "mistral-large-latest"):
+    def __init__(self, model_name: str = "mistral-large-latest", client=None):
         """
         Initialise l'agent Auditor
+
+        client : client Mistral fourni par l'orchestrateur (sinon créé depuis .env)
         """
         self.model_name = model_name
         
-        load_dotenv()
-        api_key = os.getenv("MISTRAL_API_KEY")
-        
-        if not api_key:
-            raise ValueError(
-                "MISTRAL_API_KEY not found in .env! "
-                "Create a .env file with your API key."
-            )
-        
-        self.client = Mistral(api_key=api_key)
+        if client is None:
+            api_key = get_env("MISTRAL_API_KEY")
+
+            if not api_key:
+                raise ValueError(
+                    "MISTRAL_API_KEY not found in .env! "
+                    "Create a .env file with your API key."
+                )
+
+            client = get_mistral_client(api_key)
+        self.client = client
         
         print(f"Auditor Agent initialised with the model: {model_name}")
 
-    def _load_prompt(self) -> str:
+    @staticmethod
+    def _load_prompt() -> str:
         """
-        Charge le prompt Auditor depuis le fichier .txt
+        Charge le prompt Auditor depuis le fichier .txt (lu une seule fois par processus)
         """
-        prompt_path = (
-            Path(__file__).resolve()
-            .parent.parent / "prompts" / "auditor_prompt.txt"
-        )
+        return load_prompt("auditor_prompt.txt")
 
-        if not prompt_path.exists():
-            raise FileNotFoundError(
-                f"auditor_prompt.txt not found in: {prompt_path}"
-            )
+    @staticmethod
+    def _analyze_one(file_path: str, content: str, pylint_report: Dict) -> Dict:
+        """
+        Construit l'analyse d'un fichier à partir de son contenu et de son rapport pylint
+        """
+        length = len(content)
+
+        return {
+            "file": file_path,
+            "code_preview": content if length <= 1000 else f"{content[:1000]}...",
+            "code_length": length,
+            "pylint": pylint_report,
+        }
 
-        return prompt_path.read_text(encoding="utf-8")
+    @staticmethod
+    def _pylint_reports(python_files: List[str]) -> Dict[str, Dict]:
+        """
+        Rapports pylint par fichier, via run_pylint_batch (cache disque, puis pylint ; un appel par cœur)
+        """
+        # pylint est lié au CPU dans son sous-processus : on répartit les fichiers
+        # sur plusieurs processus lancés en parallèle (le GIL est relâché en attente)
+        workers = min(len(python_files), os.cpu_count() or 1)
+        chunks = [python_files[i::workers] for i in range(workers)]
+        reports = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for chunk_reports in executor.map(run_pylint_batch, chunks):
+                reports.update(chunk_reports)
+        return reports
     
-    def analyze(self, target_dir: Path) -> Dict:
+    def analyze(self, target_dir: Path, python_files: Optional[List[str]] = None) -> Dict:
         """
         Global audit of a target directory (sandbox)
-        """
-        print(f"\nAuditor: Analysis of {len(str(target_dir) )} files...")
 
+        python_files permet de fournir une liste de fichiers déjà établie
+        (sinon elle est calculée ici)
+        """
         prompt_template = self._load_prompt()
 
-        files = list_files(target_dir)
-        python_files = [f for f in files if f.endswith(".py")]
+        # list_files ne renvoie déjà que des *.py (hors .backups) : pas de second filtrage
+        if python_files is None:
+            python_files = list_files(target_dir)
+
+        print(f"\nAuditor: Analysis of {len(python_files)} files...")
+
+        # Rien à auditer : inutile d'interroger le modèle
+        if not python_files:
+            return {"summary": "No Python files found in the target directory.", "issues": []}
+
+        # Lecture mémoïsée (contenu réutilisé tant que le fichier ne change pas)
+        contents = read_files(python_files)
+
+        # Fichiers au contenu inchangé depuis un audit précédent : même plan, sans relancer
+        # pylint ni interroger le modèle. Clé sur le contenu et non sur les dates : une
+        # restauration (git checkout, copie de sauvegarde) peut remettre l'ancienne date
+        cache = get_cache()
+        plan_key = make_key(
+            self.model_name,
+            prompt_template,
+            pylint_version(),
+            orjson.dumps(sorted((f, make_key(contents[f])) for f in python_files)).decode(),
+        )
+        cached_plan = cache.get("plans", plan_key, max_age=PLAN_CACHE_TTL)
+        if cached_plan is not None:
+            print("Auditor: Sources unchanged since a previous audit, reusing its plan.")
+            log_experiment(
+                agent_name="Auditor_Agent",
+                model_used=self.model_name,
+                action=ActionType.ANALYSIS,
+                details={
+                    "target_directory": str(target_dir),
+                    "files_analyzed": python_files,
+                    "input_prompt": f"plan cache lookup {plan_key}",
+                    "output_response": orjson.dumps(cached_plan).decode(),
+                    "cache_hit": True,
+                    "plan_cache_hit": True,
+                    "issues_found": len(cached_plan.get("issues", [])) if isinstance(cached_plan, dict) else 0,
+                    "full_analysis_result": cached_plan
+                },
+                status="SUCCESS",
+            )
+            return cached_plan
+
+        # Fichiers identiques : un seul exemplaire est analysé et envoyé au modèle
+        groups: Dict[str, List[str]] = {}
+        for f in python_files:
+            groups.setdefault(make_key(contents[f]), []).append(f)
+        unique_files = [files[0] for files in groups.values()]
+        duplicates = {files[0]: files[1:] for files in groups.values() if len(files) > 1}
+
+        # Un processus pylint par lot de fichiers (les rapports inchangés viennent du cache disque)
+        pylint_reports = self._pylint_reports(unique_files)
+
+        analyses = [
+            self._analyze_one(f, contents[f], pylint_reports[f])
+            for f in unique_files
+        ]
+        for analysis in analyses:
+            if analysis["file"] in duplicates:
+                analysis["identical_files"] = duplicates[analysis["file"]]
+
+        # Un seul appel LLM pour tout le projet, sauf s'il dépasse le budget du prompt
+        batches = self._split_batches(analyses)
+        if len(batches) == 1:
+            outputs = [self._request_plan(prompt_template, batches[0])]
+        else:
+            print(f"Auditor: Prompt too large, split into {len(batches)} requests.")
+            with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+                outputs = list(executor.map(
+                    lambda batch: self._request_plan(prompt_template, batch), batches
+                ))
 
-        analyses = []
+        if len(outputs) == 1:
+            result = outputs[0][0]
+        else:
+            # Fusion des plans partiels : résumés mis bout à bout, issues concaténées
+            result = {
+                "summary": "\n".join(
+                    str(plan.get("summary", "")) for plan, *_ in outputs if isinstance(plan, dict)
+                ),
+                "issues": [
+                    issue
+                    for plan, *_ in outputs if isinstance(plan, dict)
+                    for issue in plan.get("issues", [])
+                ],
+            }
 
-        for file_path in python_files:
-            content = read_file(file_path)
-            pylint_report = run_pylint(file_path)
+        # Les issues d'un fichier s'appliquent aussi à ses copies identiques
+        issues = result.get("issues") if isinstance(result, dict) else None
+        if duplicates and isinstance(issues, list):
+            result["issues"] = issues + [
+                dict(issue, file=copy)
+                for issue in issues if isinstance(issue, dict)
+                for copy in duplicates.get(issue.get("file"), [])
+            ]
 
-            analyses.append(
-                {
-                    "file": file_path,
-                    "code_preview": content[:1000] + "..." if len(content) > 1000 else content,
-                    "code_length": len(content),
-                    "pylint": pylint_report,
-                }
+        for index, (plan, full_prompt, llm_response, clean_response, cache_hit) in enumerate(outputs):
+            details = {
+                "target_directory": str(target_dir),
+                "files_analyzed": python_files,  # déjà des str
+                "input_prompt": full_prompt,
+                "output_response": llm_response,
+                "cleaned_response": clean_response,
+                "cache_hit": cache_hit,
+                "unique_files": len(unique_files),
+                "issues_found": len(result.get("issues", [])) if isinstance(result, dict) else 0,
+                "full_analysis_result": result
+            }
+            if len(outputs) > 1:
+                details["batch"] = f"{index + 1}/{len(outputs)}"
+                details["batch_files"] = [a["file"] for a in batches[index]]
+
+            log_experiment(
+                agent_name="Auditor_Agent",
+                model_used=self.model_name,
+                action=ActionType.ANALYSIS,
+                details=details,
+                status="SUCCESS",
             )
 
+        cache.set("plans", plan_key, result)
+
+        return result
+
+    @staticmethod
+    def _split_batches(analyses: List[Dict]) -> List[List[Dict]]:
+        """
+        Répartit les analyses en lots dont la taille sérialisée reste sous AUDIT_MAX_CHARS
+        """
+        batches: List[List[Dict]] = [[]]
+        size = 0
+        for analysis in analyses:
+            analysis_size = len(orjson.dumps(analysis, option=orjson.OPT_INDENT_2))
+            if batches[-1] and size + analysis_size > AUDIT_MAX_CHARS:
+                batches.append([])
+                size = 0
+            batches[-1].append(analysis)
+            size += analysis_size
+        return batches
+
+    def _request_plan(self, prompt_template: str, analyses: List[Dict]) -> Tuple[Dict, str, str, str, bool]:
+        """
+        Demande au modèle le plan de refactoring d'un lot de fichiers
+
+        Retourne (plan, prompt, réponse brute, réponse nettoyée, servi par le cache)
+        """
         full_prompt = (
             f"{prompt_template}\n\n"
             f"PROJECT FILES ANALYSIS:\n"
-            f"{json.dumps(analyses, indent=2)}"
+            f"{orjson.dumps(analyses, option=orjson.OPT_INDENT_2).decode()}"
         )
 
-        response = self.client.chat.complete(
-            model=self.model_name,
-            messages=[{"role": "user", "content": full_prompt}],
-            response_format={"type": "json_object"}
-        )
-        llm_response = response.choices[0].message.content
+        # Même prompt + même modèle => même plan (temperature=0) : pas de nouvel appel
+        cache = get_cache()
+        cache_key = make_key(self.model_name, full_prompt)
+        llm_response = cache.get("auditor", cache_key)
+        cache_hit = llm_response is not None
+
+        if not cache_hit:
+            response = self.client.chat.complete(
+                model=self.model_name,
+                messages=[{"role": "user", "content": full_prompt}],
+                response_format={"type": "json_object"},
+                temperature=0
+            )
+            llm_response = response.choices[0].message.content
 
         # Nettoyage robuste de la réponse JSON (même avec le mode JSON, parfois utile)
         clean_response = llm_response.strip()
-        
-        # 1. Essayer d'extraire le bloc markdown
-        if "```json" in clean_response:
-            parts = clean_response.split("```json")
-            if len(parts) > 1:
-                clean_response = parts[1].split("```")[0].strip()
-        elif "```" in clean_response:
-             parts = clean_response.split("```")
-             if len(parts) > 1:
-                # Souvent le premier bloc est celui qui nous intéresse
-                clean_response = parts[1].strip()
+
+        # 1. Hors mode JSON pur, extraire le bloc markdown en un seul passage
+        if not clean_response.startswith("{"):
+            match = _JSON_FENCE_RE.search(clean_response)
+            if match:
+                clean_response = match.group(1)
 
         # 2. Si ce n'est toujours pas propre, chercher les accolades extrêmes
-        if not clean_response.startswith("{") and "{" in clean_response:
+        if not clean_response.startswith("{"):
             start = clean_response.find("{")
             end = clean_response.rfind("}")
-            if start != -1 and end != -1:
+            if start != -1 and end > start:
                 clean_response = clean_response[start:end+1]
 
         try:
-            result = json.loads(clean_response)
-        except json.JSONDecodeError as exc:
+            result = orjson.loads(clean_response)
+        except orjson.JSONDecodeError as exc:
              # Log the raw response for debugging
             print(f"FAILED JSON PARSING. Raw response:\n{llm_response}\nCleaned response:\n{clean_response}")
             raise ValueError(f"LLM response is not valid JSON: {exc}") from exc
 
-        log_experiment(
-            agent_name="Auditor_Agent",
-            model_used=self.model_name,
-            action=ActionType.ANALYSIS,
-            details={
-                "target_directory": str(target_dir),
-                "files_analyzed": [str(p) for p in python_files],
-                "input_prompt": full_prompt,
-                "output_response": llm_response,
-                "cleaned_response": clean_response,
-                "issues_found": len(result.get("issues", [])) if isinstance(result, dict) else 0,
-                "full_analysis_result": result
-            },
-            status="SUCCESS",
-        )
+        if not cache_hit:
+            cache.set("auditor", cache_key, llm_response)
 
-        return result
+        return result, full_prompt, llm_response, clean_response, cache_hit
@@ -2,141 +2,415 @@
 Fixer Agent - Corrige le code selon le plan de refactoring
 """
 
-import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
-import json
+from typing import Dict, List, Optional, Tuple
 
-from mistralai import Mistral
-from dotenv import load_dotenv
+import orjson
 
-from src.tools.file_operations import read_file, write_file, backup_file
+from src.tools.file_operations import read_file, read_files, write_file, backup_file
 from src.tools.sandbox_security import validate_path
+from src.utils.cache import make_key
+from src.utils.env import get_env
+from src.utils.llm_clients import get_mistral_client
+from src.utils.llm_cache import cached_complete, estimate_tokens
 from src.utils.logger import log_experiment, ActionType
+from src.utils.prompts import load_prompt
+from src.utils.text import strip_code_fence
+
+# Au-delà de cette taille cumulée (caractères), on repasse à un appel par fichier
+BATCH_MAX_CHARS = 20_000
 
 class FixerAgent:
     """
     Agent responsable de la correction du code source
     """
     
-    def __init__(self, model_name: str = "mistral-large-latest"):
+    def __init__(self, model_name: str = "mistral-large-latest", max_concurrency: int = 8, client=None):
         """
         Initialise l'agent Fixer
+
+        max_concurrency borne le nombre d'appels LLM simultanés (rate limit Mistral)
+        client : client Mistral fourni par l'orchestrateur (sinon créé depuis .env)
         """
         self.model_name = model_name
-        
-        load_dotenv()
-        api_key = os.getenv("MISTRAL_API_KEY")
-        
-        if not api_key:
-            raise ValueError(
-                "MISTRAL_API_KEY non trouvée dans .env! "
-                "Créez un fichier .env avec votre clé API."
-            )
-        
-        self.client = Mistral(api_key=api_key)
+        self.max_concurrency = max_concurrency
+
+        if client is None:
+            api_key = get_env("MISTRAL_API_KEY")
+
+            if not api_key:
+                raise ValueError(
+                    "MISTRAL_API_KEY non trouvée dans .env! "
+                    "Créez un fichier .env avec votre clé API."
+                )
+
+            # Client partagé avec les autres agents (même pool HTTP)
+            client = get_mistral_client(api_key)
+        self.client = client
+
+        # Empreintes (code, issues, erreurs) pour lesquelles le LLM n'a rien changé
+        self._unchanged = set()
+
+        # Dernier échange par fichier : (issues, premier message utilisateur, réponse, code écrit)
+        self._history: Dict[str, Tuple[str, str, str, str]] = {}
+
+        # Pool conservé d'une itération à l'autre : les threads sont créés une seule fois
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_concurrency), thread_name_prefix="fixer"
+        )
         
         print(f"Fixer Agent initialisé avec le modèle: {model_name}")
 
-    def _load_prompt(self) -> str:
+    @staticmethod
+    def _load_prompt(filename: str = "fixer_prompt.txt") -> str:
         """
-        Charge le prompt Fixer depuis le fichier .txt
+        Charge un prompt Fixer depuis le fichier .txt (lu une seule fois par processus)
         """
-        prompt_path = (
-            Path(__file__).resolve()
-            .parent.parent / "prompts" / "fixer_prompt.txt"
-        )
-
-        if not prompt_path.exists():
-            raise FileNotFoundError(
-                f"fixer_prompt.txt not found in: {prompt_path}"
-            )
-
-        return prompt_path.read_text(encoding="utf-8")
+        return load_prompt(filename)
     
     def _clean_generated_code(self, code: str) -> str:
         """
         Nettoie le code généré par le LLM (enlève les balises markdown et extrait le code)
         """
-        # Si le modele renvoie des blocs de code markdown, on essaie de les extraire
-        if "```python" in code:
-            parts = code.split("```python")
-            if len(parts) > 1:
-                code = parts[1].split("```")[0]
-        elif "```" in code:
-            parts = code.split("```")
-            if len(parts) > 1:
-                code = parts[1]
-                
-        return code.strip()
+        # Si le modele renvoie un bloc de code markdown, on l'extrait en un seul passage
+        return strip_code_fence(code)
     
-    def fix_code(self, refactoring_plan: Dict, test_errors: Optional[str] = None) -> Dict:
+    @staticmethod
+    def _build_messages(system_prompt: str, user_content: str) -> List[Dict]:
         """
-        Corrige tous les fichiers selon le plan de refactoring
+        Messages envoyés au modèle : les consignes (identiques pour tous les fichiers et
+        toutes les itérations) viennent en tête, seule la partie variable change ensuite,
+        ce qui permet au fournisseur de réutiliser le préfixe déjà traité.
+        Les erreurs de tests, qui changent à chaque itération, sont toujours en fin de message.
         """
-        print(f"\nFixer: Correction...")
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content},
+        ]
 
-        issues: List[Dict] = refactoring_plan.get("issues", [])
-        results = []
+    def _fix_file(self, file_issues: List[Dict], prompt_template: str,
+                  test_errors: Optional[str]) -> List[Dict]:
+        """
+        Corrige toutes les issues d'un même fichier en un seul appel LLM (exécuté dans un thread)
+        """
+        # Toutes les issues concernent le même fichier (déjà validé par fix_code)
+        file_path = Path(file_issues[0]["file"])
+        file_str = str(file_path)
 
-        prompt_template = self._load_prompt()
-        
-        # Corriger chaque issue
-        for issue in issues:
-            file_path = Path(issue["file"])
-            validate_path(file_path)
+        original_code = read_file(file_path)
+        # backup_file(file_path)
 
-            original_code = read_file(file_path)
-            # backup_file(file_path)
+        issues_json = orjson.dumps(file_issues, option=orjson.OPT_INDENT_2).decode()
 
-            prompt = (
-                f"{prompt_template}\n\n"
-                f"ISSUE TO FIX:\n"
-                f"{json.dumps(issue, indent=2)}\n\n"
+        # Même fichier, mêmes issues, mêmes erreurs qu'un appel resté sans effet : on ne rappelle pas le LLM
+        state_key = make_key(original_code, issues_json, test_errors or "")
+        if state_key in self._unchanged:
+            return []
+
+        history = self._history.get(file_str)
+        if (test_errors and history and history[0] == issues_json
+                and history[3] == original_code.strip()):
+            # Le fichier est tel que nous l'avons écrit : on poursuit la conversation.
+            # Le préfixe (système, issues, code initial, réponse précédente) reste identique
+            # d'une itération à l'autre et peut être réutilisé par le cache de prompt du fournisseur
+            _, first_user_content, previous_response, _ = history
+            user_content = f"TEST ERRORS (Fix these errors in the code):\n{test_errors}\n\n"
+            messages = self._build_messages(prompt_template, first_user_content) + [
+                {"role": "assistant", "content": previous_response},
+                {"role": "user", "content": user_content},
+            ]
+        else:
+            user_content = (
+                f"ISSUES TO FIX:\n"
+                f"{issues_json}\n\n"
                 f"CURRENT FILE CONTENT:\n"
                 f"{original_code}\n\n"
             )
 
             if test_errors:
-                prompt += f"TEST ERRORS (Fix these errors in the code):\n{test_errors}\n\n"
+                user_content += f"TEST ERRORS (Fix these errors in the code):\n{test_errors}\n\n"
 
-            response = self.client.chat.complete(
-                 model=self.model_name,
-                 messages=[{"role": "user", "content": prompt}]
-            )
-            fixed_code = self._clean_generated_code(response.choices[0].message.content)
+            first_user_content = user_content
+            messages = self._build_messages(prompt_template, user_content)
 
-            if fixed_code.strip() == original_code.strip():
-                continue  # Nothing changed
+        prompt = "\n\n".join(message["content"] for message in messages)
 
-            write_file(file_path, fixed_code, create_backup=False)
+        llm_response, cache_hit = cached_complete(
+            self.client,
+            self.model_name,
+            messages,
+        )
+        fixed_code = self._clean_generated_code(llm_response)
 
-            results.append(
-                {
-                    "file": str(file_path),
-                    "description": issue["suggested_fix"],
-                }
-            )
+        # fixed_code sort déjà nettoyé (strip) de _clean_generated_code
+        if fixed_code == original_code.strip():
+            self._unchanged.add(state_key)
+            return []  # Nothing changed
+
+        write_file(file_path, fixed_code, create_backup=False)
+        self._history[file_str] = (issues_json, first_user_content, llm_response, fixed_code)
+
+        results = [
+            {"file": file_str, "description": issue["suggested_fix"]}
+            for issue in file_issues
+        ]
+
+        log_experiment(
+            agent_name="Fixer_Agent",
+            model_used=self.model_name,
+            action=ActionType.DEBUG if test_errors else ActionType.FIX,
+            details={
+                "file_fixed": file_str,
+                "input_prompt": prompt,
+                "output_response": llm_response,
+                "cache_hit": cache_hit,
+                "tokens_saved_estimate": estimate_tokens(prompt, llm_response) if cache_hit else 0,
+                "issues_count": len(file_issues),
+                "issue_description": [i.get("description", "N/A") for i in file_issues],
+                "suggested_fix": [i.get("suggested_fix", "N/A") for i in file_issues],
+                "test_errors_context": test_errors if test_errors else "None",
+                # Le code d'origine est déjà dans input_prompt et le code corrigé dans
+                # output_response : on ne stocke que leurs empreintes
+                "original_code_hash": make_key(original_code),
+                "fixed_code_hash": make_key(fixed_code),
+            },
+            status="SUCCESS",
+        )
+
+        return results
+
+    @staticmethod
+    def _parse_batch_response(llm_response: str) -> Optional[Dict[str, str]]:
+        """
+        Extrait le dictionnaire {fichier: code} d'une réponse batch, ou None si inexploitable
+
+        Les chemins sont normalisés ("./sandbox/x.py" -> "sandbox/x.py") et les
+        entrées dont le code n'est pas une chaîne sont ignorées.
+        """
+        try:
+            fixed_files = orjson.loads(llm_response).get("files")
+        except (orjson.JSONDecodeError, AttributeError):
+            return None
+
+        if not isinstance(fixed_files, dict):
+            return None
+        return {
+            str(Path(file)): code for file, code in fixed_files.items()
+            if isinstance(file, str) and isinstance(code, str)
+        }
+
+    def _fix_batch(self, issues_by_file: Dict[str, List[Dict]], contents: Dict[str, str],
+                   test_errors: Optional[str]) -> Optional[Tuple[List[Dict], Dict[str, List[Dict]]]]:
+        """
+        Corrige tous les fichiers en un seul appel LLM (réponse JSON {fichier: code}).
+
+        Retourne (résultats, fichiers absents de la réponse avec leurs issues), ou None
+        si la réponse est inexploitable : ces fichiers repassent par la correction par fichier.
+        """
+        payload = [
+            {"file": file, "issues": file_issues, "content": contents[file]}
+            for file, file_issues in issues_by_file.items()
+        ]
+
+        system_prompt = self._load_prompt('fixer_batch_prompt.txt')
+        user_content = (
+            f"FILES TO FIX:\n"
+            f"{orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode()}\n\n"
+        )
 
-            log_experiment(
-                agent_name="Fixer_Agent",
-                model_used=self.model_name,
-                action=ActionType.DEBUG if test_errors else ActionType.FIX,
-                details={
-                    "file_fixed": str(file_path),
-                    "input_prompt": prompt,
-                    "output_response": response.choices[0].message.content,
-                    "issue_description": issue.get("description", "N/A"),
-                    "suggested_fix": issue.get("suggested_fix", "N/A"),
-                    "test_errors_context": test_errors if test_errors else "None",
-                    "original_code_snippet": original_code, 
-                    "fixed_code_snippet": fixed_code
-                },
-                status="SUCCESS",
+        if test_errors:
+            user_content += f"TEST ERRORS (Fix these errors in the code):\n{test_errors}\n\n"
+
+        messages = self._build_messages(system_prompt, user_content)
+        prompt = f"{system_prompt}\n\n{user_content}"
+
+        llm_response, cache_hit = cached_complete(
+            self.client,
+            self.model_name,
+            messages,
+            # Mise en cache seulement si la réponse couvre tous les fichiers demandés
+            accept=lambda text: self._batch_covers(text, issues_by_file),
+            response_format={"type": "json_object"},
+        )
+
+        fixed_files = self._parse_batch_response(llm_response)
+        if fixed_files is None:
+            print("Fixer: Batch response unusable, falling back to per-file fixes.")
+            return None
+
+        results = []
+        missing = {}
+        for file, file_issues in issues_by_file.items():
+            fixed_code = fixed_files.get(str(Path(file)))
+            if fixed_code is None:
+                missing[file] = file_issues
+                continue
+
+            fixed_code = self._clean_generated_code(fixed_code)
+            if fixed_code == contents[file].strip():
+                continue  # Nothing changed
+
+            write_file(file, fixed_code, create_backup=False)
+            results.extend(
+                {"file": str(Path(file)), "description": issue["suggested_fix"]}
+                for issue in file_issues
             )
 
+        log_experiment(
+            agent_name="Fixer_Agent",
+            model_used=self.model_name,
+            action=ActionType.DEBUG if test_errors else ActionType.FIX,
+            details={
+                "files_fixed": [r["file"] for r in results],
+                "input_prompt": prompt,
+                "output_response": llm_response,
+                "cache_hit": cache_hit,
+                "tokens_saved_estimate": estimate_tokens(prompt, llm_response) if cache_hit else 0,
+                "batched_files": list(issues_by_file),
+                "missing_files": list(missing),
+                "test_errors_context": test_errors if test_errors else "None",
+            },
+            status="SUCCESS",
+        )
+
+        if missing:
+            print(f"Fixer: {len(missing)} file(s) missing from the batch response, fixing them one by one.")
+        return results, missing
+
+    @classmethod
+    def _batch_covers(cls, llm_response: str, issues_by_file: Dict[str, List[Dict]]) -> bool:
+        """
+        Vrai si la réponse batch contient le code de chacun des fichiers demandés
+        """
+        fixed_files = cls._parse_batch_response(llm_response)
+        return fixed_files is not None and all(
+            str(Path(file)) in fixed_files for file in issues_by_file
+        )
+
+    @staticmethod
+    def _split_twins(issues_by_file: Dict[str, List[Dict]],
+                     contents: Dict[str, str]) -> Dict[str, List[Tuple[str, List[Dict]]]]:
+        """
+        Retire de issues_by_file les fichiers identiques (même contenu, mêmes issues)
+        à un autre fichier du plan : seul le premier sera envoyé au LLM.
+
+        Retourne {fichier conservé: [(copie, issues de la copie), ...]}
+        """
+        groups: Dict[str, List[str]] = {}
+        for file, file_issues in issues_by_file.items():
+            issues_json = orjson.dumps(
+                [{k: v for k, v in issue.items() if k != "file"} for issue in file_issues],
+                option=orjson.OPT_SORT_KEYS,
+            ).decode()
+            groups.setdefault(make_key(contents[file], issues_json), []).append(file)
+
+        twins = {}
+        for files in groups.values():
+            if len(files) > 1:
+                twins[files[0]] = [(copy, issues_by_file.pop(copy)) for copy in files[1:]]
+        return twins
+
+    @staticmethod
+    def _copy_to_twins(twins: Dict[str, List[Tuple[str, List[Dict]]]],
+                       results: List[Dict]) -> List[Dict]:
+        """
+        Recopie la correction de chaque fichier conservé sur ses copies identiques
+        """
+        written = {r["file"] for r in results}
+        copied = []
+        for original, copies in twins.items():
+            if str(Path(original)) not in written:
+                continue  # Rien n'a changé : les copies restent telles quelles
+
+            fixed_code = read_file(original)
+            for copy, copy_issues in copies:
+                write_file(copy, fixed_code, create_backup=False)
+                copied.extend(
+                    {"file": str(Path(copy)), "description": issue["suggested_fix"]}
+                    for issue in copy_issues
+                )
+        return copied
+
+    def _fix_files(self, issues_by_file: Dict[str, List[Dict]], prompt_template: str,
+                   test_errors: Optional[str]) -> List[Dict]:
+        """
+        Corrige les fichiers un par un (une requête par fichier), en parallèle
+        """
+        futures = {
+            file: self._executor.submit(self._fix_file, file_issues, prompt_template, test_errors)
+            for file, file_issues in issues_by_file.items()
+        }
+        # Un échec (erreur API persistante...) n'annule pas les corrections des autres fichiers
+        results = []
+        for file, future in futures.items():
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                print(f"Fixer: Could not fix {file}: {e}")
+                log_experiment(
+                    agent_name="Fixer_Agent",
+                    model_used=self.model_name,
+                    action=ActionType.DEBUG if test_errors else ActionType.FIX,
+                    details={
+                        "file_fixed": file,
+                        "input_prompt": f"fix {file}",
+                        "output_response": "",
+                        "error": str(e),
+                    },
+                    status="FAILED",
+                )
+        return results
+
+    def fix_code(self, refactoring_plan: Dict, test_errors: Optional[str] = None) -> Dict:
+        """
+        Corrige tous les fichiers selon le plan de refactoring
+        """
+        print(f"\nFixer: Correction...")
+
+        issues: List[Dict] = refactoring_plan.get("issues", [])
+
+        # Plan vide (code déjà propre) : ni prompt, ni appel LLM
+        if not issues:
+            return {"results": [], "written_files": [], "files_modified": 0,
+                    "notes": "No changes were applied."}
+
+        prompt_template = self._load_prompt()
+
+        # Une requête par fichier (toutes ses issues ensemble) ; les fichiers
+        # sont corrigés en parallèle
+        issues_by_file: Dict[str, List[Dict]] = {}
+        for issue in issues:
+            issues_by_file.setdefault(issue["file"], []).append(issue)
+
+        for file in issues_by_file:
+            validate_path(Path(file))
+
+        contents = read_files(list(issues_by_file))
+        twins = self._split_twins(issues_by_file, contents)
+
+        # Petits fichiers : une seule requête pour tout le plan (prompt système envoyé une fois)
+        results: List[Dict] = []
+        remaining = issues_by_file
+        if len(issues_by_file) > 1:
+            if sum(len(contents[f]) for f in issues_by_file) <= BATCH_MAX_CHARS:
+                batch = self._fix_batch(issues_by_file, contents, test_errors)
+                if batch is not None:
+                    # Fichiers absents de la réponse : corrigés un par un ci-dessous
+                    results, remaining = batch
+
+        if remaining:
+            results.extend(self._fix_files(remaining, prompt_template, test_errors))
+
+        results.extend(self._copy_to_twins(twins, results))
+
+        # Fichiers réellement réécrits (dans l'ordre, sans doublon)
+        written_files = list(dict.fromkeys(r["file"] for r in results))
+
         return {
             "results": results,
+            "written_files": written_files,
+            "files_modified": len(written_files),
             "notes": (
                 "Fixes applied strictly based on the Auditor plan "
                 "and optional Judge error feedback."
@@ -2,15 +2,27 @@
 Judge Agent - Exécute les tests et valide le code corrigé
 """
 
+import ast
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
-
-from dotenv import load_dotenv
+from typing import Dict, List, Optional, Set, Tuple
 
 from src.tools.test_tools import run_pytest
-from src.tools.analysis_tools import run_pylint
+from src.tools.analysis_tools import run_pylint_batch
+from src.tools.file_operations import iter_python_sources
 from src.utils.logger import log_experiment, ActionType
+from src.utils.prompts import load_prompt
+
+# Ligne pytest signalant un échec ("x.py::test_a FAILED", "FAILED x.py::test_a - ...")
+_FAILURE_RE = re.compile(
+    r"^(?=[^\n]*FAILED)[^\n]*?(?P<file>[^\s:\[\]]+)::(?P<test>\S+)[^\n]*$",
+    re.MULTILINE,
+)
+
+# Au-delà, le Fixer a déjà de quoi travailler : pytest s'arrête (--maxfail)
+MAX_REPORTED_FAILURES = 10
 
 
 class JudgeAgent:
@@ -23,31 +35,57 @@ class JudgeAgent:
         Initialise l'agent Judge
         """
         self.model_name = model_name
+
+        # Mémoire entre deux itérations pour les exécutions incrémentales
+        self._failing_test_files: Set[str] = set()
+        # Graphe d'imports : chemin -> (mtime_ns, taille, noms importés), réanalysé si le fichier change
+        self._imports: Dict[str, Tuple[int, int, Optional[Set[str]]]] = {}
         print(f"Judge Agent initialisé")
 
     def _load_prompt(self) -> str:
         """
-        Charge le prompt Judge depuis le fichier .txt
+        Charge le prompt Judge depuis le fichier .txt (lu une seule fois par processus)
         """
-        prompt_path = (
-            Path(__file__).resolve()
-            .parent.parent / "prompts" / "judge_prompt.txt"
-        )
+        return load_prompt("judge_prompt.txt")
 
-        if not prompt_path.exists():
-            raise FileNotFoundError(
-                f"judge_prompt.txt not found in: {prompt_path}"
-            )
-
-        return prompt_path.read_text(encoding="utf-8")
-
-    def run_tests(self, target_dir: Path) -> Dict:
+    def run_tests(self, target_dir: Path, changed: Optional[List[str]] = None) -> Dict:
         """
         Exécute les tests unitaires avec pytest ET l'analyse Pylint
+
+        changed: fichiers réécrits par le Fixer depuis la dernière exécution. Si fourni,
+        seuls les tests qui en dépendent (et ceux qui échouaient) sont relancés d'abord.
+        Pylint porte toujours sur tous les fichiers : les rapports inchangés viennent du
+        cache disque de run_pylint_batch.
         """
         print(f"\nJudge: Running tests...")
-        
-        pytest_result = run_pytest(target_dir)
+
+        # Analyser les fichiers Python (hors tests)
+        python_files = list(iter_python_sources(str(target_dir)))
+
+        # Pylint ne dépend pas du résultat de pytest : les deux s'exécutent en même temps.
+        # Un processus pylint par lot de fichiers (démarrage amorti), 2 cœurs laissés libres pour pytest
+        max_workers = max(1, min(len(python_files), (os.cpu_count() or 1) - 2))
+        chunks = [python_files[i::max_workers] for i in range(max_workers) if python_files[i::max_workers]]
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        futures = [
+            # Chemins absolus : les chemins de target_dir ne sont pas relatifs à la sandbox
+            (chunk, executor.submit(run_pylint_batch, [os.path.abspath(f) for f in chunk]))
+            for chunk in chunks
+        ]
+        executor.shutdown(wait=False)
+
+        pytest_result = None
+        if changed is not None:
+            test_files = self._select_tests(target_dir, changed)
+            if test_files:
+                print(f"Judge: Running {len(test_files)} affected test file(s) first...")
+                pytest_result = run_pytest(target_dir, test_files=test_files,
+                                           max_failures=MAX_REPORTED_FAILURES)
+
+        # Suite complète : premier passage, ou confirmation d'un passage incrémental réussi
+        # (les régressions entre modules ne passent donc jamais inaperçues)
+        if pytest_result is None or pytest_result.get("success", False):
+            pytest_result = run_pytest(target_dir, max_failures=MAX_REPORTED_FAILURES)
 
         tests_passed = pytest_result.get("success", False)
         output = pytest_result.get("output", "")
@@ -56,29 +94,32 @@ class JudgeAgent:
         pylint_results = {}
         
         if tests_passed:
-            print(f"Judge: Tests passed. Running Pylint analysis...")
-            # Analyser les fichiers Python (hors tests)
-            python_files = [
-                f for f in target_dir.rglob("*.py")
-                if not f.name.startswith("test_") and f.name != "__init__.py"
-            ]
-            
-            for file_path in python_files:
-                try:
-                    lint_res = run_pylint(str(file_path))
-                    score = lint_res.get("score", 0)
-                    pylint_results[str(file_path)] = lint_res
-                    
-                    print(f"  - {file_path.name}: {score}/10")
-                    
-                    if score < 8.0:
-                        pylint_success = False
-                except Exception as e:
-                    print(f"  - Warning: Could not lint {file_path}: {e}")
-                    # En cas d'erreur d'outil, on ne bloque pas forcément, mais ici on veut forcer la qualité
-                    # Considérons que si on ne peut pas linter, c'est un échec ou on ignore ? 
-                    # Pour la sécurité, marquons comme échec si critique, sinon log warning.
-                    pass
+            print(f"Judge: Tests passed. Collecting Pylint analysis...")
+        
+        for chunk, future in futures:
+            try:
+                chunk_results = future.result()
+            except Exception as e:
+                print(f"  - Warning: Could not lint {', '.join(chunk)}: {e}")
+                # En cas d'erreur d'outil, on ne bloque pas forcément, mais ici on veut forcer la qualité
+                # Considérons que si on ne peut pas linter, c'est un échec ou on ignore ? 
+                # Pour la sécurité, marquons comme échec si critique, sinon log warning.
+                continue
+
+            for file_path in chunk:
+                lint_res = chunk_results[os.path.abspath(file_path)]
+                # Pas de score (fichier non analysable) : compte comme un échec
+                score = lint_res.get("score") or 0
+                pylint_results[file_path] = lint_res
+                
+                if tests_passed:
+                    print(f"  - {os.path.basename(file_path)}: {score}/10")
+                
+                if score < 8.0:
+                    pylint_success = False
+
+        # Ordre des fichiers du projet (les lots sont répartis en alternance)
+        pylint_results = {f: pylint_results[f] for f in python_files if f in pylint_results}
 
         # Le succès global nécessite : Tests OK ET Pylint >= 8
         global_success = tests_passed and pylint_success
@@ -89,14 +130,18 @@ class JudgeAgent:
                 "message": "All tests passed and Pylint score >= 8. Mission complete.",
                 "pylint_results": pylint_results
             }
+            self._failing_test_files = set()
         else:
             failing_tests = self._extract_failures(output)
+            self._failing_test_files = {
+                Path(f["file"]).name for f in failing_tests if f["file"].endswith(".py")
+            }
             
             # Si les tests passent mais Pylint échoue, on ajoute les erreurs Pylint au feedback
             if tests_passed and not pylint_success:
                 lint_errors = ["PYLINT QUALITY CHECK FAILED (Score < 8.0):"]
                 for fpath, res in pylint_results.items():
-                    score = res.get("score", 0)
+                    score = res.get("score") or 0
                     if score < 8.0:
                         lint_errors.append(f"\nFile: {Path(fpath).name} (Score: {score}/10)")
                         # Ajouter les messages importants
@@ -134,24 +179,74 @@ class JudgeAgent:
         
         return result
     
+    def _select_tests(self, target_dir: Path, changed: List[str]) -> List[str]:
+        """
+        Fichiers de test à relancer après une correction : ceux qui importent un module
+        modifié (directement ou via un autre module du projet) et ceux qui échouaient
+        """
+        modules = {}
+        for entry in os.scandir(target_dir):
+            if entry.name.endswith(".py") and entry.is_file():
+                stat = entry.stat()
+                cached = self._imports.get(entry.path)
+                if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+                    cached = (stat.st_mtime_ns, stat.st_size, self._imported_names(entry.path))
+                    self._imports[entry.path] = cached
+                modules[entry.name[:-3]] = cached[2]
+
+        # Fermeture du graphe d'imports inversé à partir des modules modifiés
+        affected = {Path(f).stem for f in changed}
+        grown = True
+        while grown:
+            grown = False
+            for name, imports in modules.items():
+                if name not in affected and (imports is None or imports & affected):
+                    affected.add(name)
+                    grown = True
+
+        selected = {
+            f"{name}.py" for name in affected
+            if name.startswith("test_") and name in modules
+        }
+        selected.update(f for f in self._failing_test_files if f[:-3] in modules)
+        return sorted(selected)
+
+    @staticmethod
+    def _imported_names(file_path: str) -> Optional[Set[str]]:
+        """
+        Noms de modules importés par un fichier (None s'il n'est pas analysable)
+        """
+        try:
+            with open(file_path, encoding="utf-8") as f:
+                tree = ast.parse(f.read())
+        except (OSError, SyntaxError, ValueError):
+            return None
+
+        names: Set[str] = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    names.update(alias.name.split("."))
+            elif isinstance(node, ast.ImportFrom):
+                if node.module:
+                    names.update(node.module.split("."))
+                names.update(alias.name for alias in node.names)
+        return names
+
     @staticmethod
     def _extract_failures(pytest_output: str) -> List[Dict]:
         """
         Extract minimal failure information from pytest output.
         """
-        failures = []
-
-        lines = pytest_output.splitlines()
-        for line in lines:
-            if "FAILED" in line and "::" in line:
-                parts = line.split("::")
-                failures.append(
-                    {
-                        "file": parts[0],
-                        "test": parts[1] if len(parts) > 1 else "unknown",
-                        "error": line.strip()
-                    }
-                )
+        # Un seul passage du moteur regex sur toute la sortie
+        failures = [
+            {
+                "file": match["file"],
+                "test": match["test"],
+                "error": match.group(0).strip()
+            }
+            for match in _FAILURE_RE.finditer(pytest_output)
+        ]
 
         if not failures and pytest_output:
             failures.append(
@@ -2,50 +2,61 @@
 TestGenerator Agent - Generates Pytest unit tests for corrected Python files
 """
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from dotenv import load_dotenv
-from mistralai import Mistral
+from typing import Optional
+from src.tools.file_operations import write_file
+from src.utils.env import get_env
+from src.utils.llm_clients import get_mistral_client
+from src.utils.cache import get_cache, make_key
+from src.utils.llm_cache import cached_complete, structural_key
 from src.utils.logger import log_experiment, ActionType
+from src.utils.prompts import load_prompt
+from src.utils.text import strip_code_fence
+
+# Placeholders of the test generator prompt
+_PROMPT_FIELD_RE = re.compile(r"\{(filename|code)\}")
+
+
+@lru_cache(maxsize=4)
+def _split_prompt(base_prompt: str) -> tuple:
+    """
+    Splits the template once into literal parts (even indexes) and field names (odd indexes)
+    """
+    return tuple(_PROMPT_FIELD_RE.split(base_prompt))
 
 class TestGeneratorAgent:
     """
     Agent responsible for generating unit tests for cleaned/corrected code.
     """
-    def __init__(self, model_name: str = "mistral-large-latest"):
+    def __init__(self, model_name: str = "mistral-large-latest", max_concurrency: int = 8, client=None):
         self.model_name = model_name
-        
-        load_dotenv()
-        api_key = os.getenv("MISTRAL_API_KEY")
-        
-        if not api_key:
-            raise ValueError("MISTRAL_API_KEY not found in .env!")
-            
-        self.client = Mistral(api_key=api_key)
+        self.max_concurrency = max_concurrency
+
+        if client is None:
+            api_key = get_env("MISTRAL_API_KEY")
+
+            if not api_key:
+                raise ValueError("MISTRAL_API_KEY not found in .env!")
+
+            # Client shared with the other agents (same HTTP connection pool)
+            client = get_mistral_client(api_key)
+        self.client = client
         print(f"TestGenerator Agent initialized with model: {model_name}")
 
     def _load_prompt(self) -> str:
         """
-        Loads the prompt from the prompts directory
+        Loads the prompt from the prompts directory (read once per process)
         """
-        prompt_path = Path(__file__).parent.parent / "prompts" / "test_generator_prompt.txt"
-        if not prompt_path.exists():
-            raise FileNotFoundError(f"Prompt file not found at {prompt_path}")
-            
-        return prompt_path.read_text(encoding="utf-8")
+        return load_prompt("test_generator_prompt.txt")
 
     def _clean_code(self, code: str) -> str:
         """
         Cleans generated code to remove markdown blocks if present
         """
-        if code.strip().startswith("```python"):
-            code = code.strip()[len("```python"):].strip()
-        elif code.strip().startswith("```"):
-            code = code.strip()[3:].strip()
-        
-        if code.strip().endswith("```"):
-            code = code.strip()[:-3].strip()
-        
-        return code
+        return strip_code_fence(code)
 
     def generate_unit_tests(self, target_dir: str):
         """
@@ -58,64 +69,118 @@ class TestGeneratorAgent:
             print(f"Target directory {target_dir} does not exist.")
             return
 
-        # Find python files that are not tests
-        py_files = [f for f in target_path.glob("*.py") if not f.name.startswith("test_")]
+        # Find python files that are not tests (names are checked on the dirent, no glob matching)
+        with os.scandir(target_path) as entries:
+            py_files = [
+                Path(entry.path) for entry in entries
+                if entry.name.endswith(".py") and not entry.name.startswith("test_")
+                and entry.is_file()
+            ]
         
         if not py_files:
             print("No source Python files found to test.")
             return
 
         base_prompt = self._load_prompt()
+
+        # Independent files: the LLM calls run concurrently (bounded by max_concurrency)
+        max_workers = max(1, min(len(py_files), self.max_concurrency))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            cache_hits = list(executor.map(
+                lambda py_file: self._generate_for_file(py_file, target_path, base_prompt),
+                py_files,
+            ))
+
+        hits = sum(hit is True for hit in cache_hits)
+        misses = sum(hit is False for hit in cache_hits)
+        print(f"TestGenerator: {hits} response(s) served from cache, {misses} generated by the LLM.")
+
+    def _generate_for_file(self, py_file: Path, target_path: Path, base_prompt: str) -> Optional[bool]:
+        """
+        Generates and writes the test file of a single source file (runs in a worker thread).
+
+        Returns True if the LLM response came from the cache, False if it was generated,
+        None if the generation failed.
+        """
+        test_filename = f"test_{py_file.name}"
+        test_file_path = target_path / test_filename
         
-        for py_file in py_files:
-            test_filename = f"test_{py_file.name}"
-            test_file_path = target_path / test_filename
+        # Skip if test file already exists? Maybe redundant if we want to regenerate?
+        # Let's regenerate to ensure they match the FIXED code.
+        
+        code_content = py_file.read_text(encoding="utf-8")
+        
+        # Format prompt
+        fields = {"filename": py_file.name, "code": code_content}
+        prompt = "".join(
+            fields[part] if i % 2 else part
+            for i, part in enumerate(_split_prompt(base_prompt))
+        )
+        
+        try:
+            print(f"Generating tests for {py_file.name}...")
+
+            # Same structure as an already tested file (only formatting, comments or
+            # docstrings differ): its generated tests still apply
+            cache = get_cache()
+            code_key = structural_key(code_content)
+            struct_key = (
+                make_key(self.model_name, base_prompt, py_file.name, code_key)
+                if code_key else None
+            )
+            llm_response = cache.get("tests_structural", struct_key) if struct_key else None
+            cache_hit = llm_response is not None
+
+            if not cache_hit:
+                llm_response, cache_hit = cached_complete(
+                    self.client,
+                    self.model_name,
+                    [{"role": "user", "content": prompt}],
+                )
+                if struct_key:
+                    cache.set("tests_structural", struct_key, llm_response)
             
-            # Skip if test file already exists? Maybe redundant if we want to regenerate?
-            # Let's regenerate to ensure they match the FIXED code.
+            generated_code = self._clean_code(llm_response)
             
-            code_content = py_file.read_text(encoding="utf-8")
+            # Unchanged tests are not rewritten (no write, mtime kept for incremental runs).
+            # Written through the sandbox tools (replaced, not rewritten in place: a
+            # backup may share the file's inode); absolute path, as target_dir is not
+            # relative to the sandbox
+            if (not test_file_path.is_file()
+                    or test_file_path.read_text(encoding="utf-8") != generated_code):
+                write_file(os.path.abspath(test_file_path), generated_code)
+                print(f"Created {test_filename}")
+            else:
+                print(f"Unchanged {test_filename}")
             
-            # Format prompt
-            prompt = base_prompt.replace("{filename}", py_file.name).replace("{code}", code_content)
+            log_experiment(
+                agent_name="TestGenerator_Agent",
+                model_used=self.model_name,
+                action=ActionType.GENERATION,
+                details={
+                    "source_file": py_file.name,
+                    "generated_test_file": test_filename,
+                    "status": "SUCCESS",
+                    "input_prompt": prompt,
+                    "output_response": generated_code,
+                    "raw_llm_response": llm_response,
+                    "cache_hit": cache_hit,
+                    "generated_code_length": len(generated_code)
+                },
+                status="SUCCESS"
+            )
+            return cache_hit
             
-            try:
-                print(f"Generating tests for {py_file.name}...")
-                response = self.client.chat.complete(
-                    model=self.model_name,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                
-                generated_code = self._clean_code(response.choices[0].message.content)
-                
-                test_file_path.write_text(generated_code, encoding="utf-8")
-                print(f"Created {test_filename}")
-                
-                log_experiment(
-                    agent_name="TestGenerator_Agent",
-                    model_used=self.model_name,
-                    action=ActionType.GENERATION,
-                    details={
-                        "source_file": py_file.name,
-                        "generated_test_file": test_filename,
-                        "status": "SUCCESS",
-                        "input_prompt": prompt,
-                        "output_response": generated_code,
-                        "raw_llm_response": response.choices[0].message.content,
-                        "generated_code_length": len(generated_code)
-                    },
-                    status="SUCCESS"
-                )
-                
-            except Exception as e:
-                print(f"Error generating tests for {py_file.name}: {e}")
-                log_experiment(
-                    agent_name="TestGenerator_Agent",
-                    model_used=self.model_name,
-                    action=ActionType.GENERATION,
-                    details={
-                        "source_file": py_file.name,
-                        "error": str(e)
-                    },
-                    status="FAILED"
-                )
+        except Exception as e:
+            print(f"Error generating tests for {py_file.name}: {e}")
+            log_experiment(
+                agent_name="TestGenerator_Agent",
+                model_used=self.model_name,
+                action=ActionType.GENERATION,
+                details={
+                    "source_file": py_file.name,
+                    "error": str(e)
+                },
+                status="FAILED"
+            )
+            return None
@@ -3,6 +3,11 @@ Orchestrator - Gère le flux d'exécution des agents
 Test-generator -> Auditor -> Fixer -> Judge en boucle
 """
 
+import hashlib
+import os
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, TypedDict, Annotated, Optional
 import operator
@@ -13,9 +18,16 @@ from src.agents.auditor import AuditorAgent
 from src.agents.fixer import FixerAgent
 from src.agents.judge import JudgeAgent
 from src.agents.test_generator import TestGeneratorAgent
+from src.tools.file_operations import iter_python_sources, list_files
 from src.tools.refactoring_tools import RefactoringTools
+from src.tools.registry import set_tools
+from src.utils.env import get_env
+from src.utils.llm_clients import get_mistral_client
 from src.utils.logger import log_experiment, ActionType
 
+# Erreurs qui rendent le plan de l'Auditor obsolète (la structure du code a changé)
+_STRUCTURAL_ERROR_RE = re.compile(r"ImportError|ModuleNotFoundError|SyntaxError")
+
 
 # Définir l'état du système (State Schema)
 class RefactoringState(TypedDict):
@@ -26,14 +38,11 @@ class RefactoringState(TypedDict):
     """
     # Données d'entrée
     target_dir: str
-    python_files: List[Path]
-
-    # Outils partagés
-    tools: RefactoringTools
 
     # Résultats de l'Auditor
     refactoring_plan: Dict
     audit_completed: bool
+    audit_iteration: int
 
     # Indicateur pour TestGenerator
     tests_generated: bool
@@ -50,6 +59,10 @@ class RefactoringState(TypedDict):
     should_continue: bool
     max_iterations: int
 
+    # Empreinte des fichiers Python jugés en dernier, et arrêt si le Fixer ne change plus rien
+    workspace_hash: Optional[str]
+    stalled: bool
+
     # Résultats du Judge
     test_results: Dict
     tests_passed: bool
@@ -66,12 +79,24 @@ class LangGraphOrchestrator:
     Orchestrateur basé sur LangGraph pour gérer le workflow multi-agents
     """
 
-    def __init__(self, max_iterations: int = 10, model_name: str = "mistral-large-latest", target_dir: str = "./sandbox"):
+    def __init__(self, max_iterations: int = 10, model_name: str = "mistral-large-latest", target_dir: str = "./sandbox",
+                 max_concurrency: int = 8, judge_cache_enabled: bool = True,
+                 min_existing_tests: int = 1):
         """
         Initialise l'orchestrateur LangGraph
+
+        max_concurrency borne les appels LLM simultanés du Fixer et du TestGenerator
+        (à ajuster selon la limite de débit de l'API Mistral)
+        judge_cache_enabled réutilise le verdict du Judge pour un contenu déjà jugé
+        (à désactiver si les tests dépendent d'éléments extérieurs aux fichiers Python)
+        min_existing_tests : à partir de ce nombre de fichiers test_*.py déjà présents
+        (hors test_<module>.py écrits par le TestGenerator), le projet est jugé avec ses
+        propres tests et le TestGenerator n'est pas appelé (0 pour toujours générer)
         """
         self.max_iterations = max_iterations
         self.model_name = model_name
+        self.judge_cache_enabled = judge_cache_enabled
+        self.min_existing_tests = min_existing_tests
 
         print("=" * 30)
         print("INITIALISATION DU REFACTORING SWARM avec LangGraph")
@@ -80,6 +105,8 @@ class LangGraphOrchestrator:
         # Initialiser les outils
         print(f"\n🔧 Initializing RefactoringTools...")
         self.tools = RefactoringTools(base_sandbox=target_dir)
+        # Même instance (et même sandbox) pour les agents via file_operations / analysis_tools
+        set_tools(self.tools)
         self.sandbox_info = self.tools.get_sandbox_info()
         print(f"   ✅ Sandbox: {self.sandbox_info['sandbox_path']}")
         print(
@@ -88,22 +115,41 @@ class LangGraphOrchestrator:
         print(
             f"   ✅ Backups available: {self.sandbox_info['backups_available']}")
 
+        # Un seul client Mistral (et un seul pool HTTP) injecté dans tous les agents ;
+        # sans clé, chaque agent lève sa propre erreur explicite
+        api_key = get_env("MISTRAL_API_KEY")
+        self.llm_client = get_mistral_client(api_key) if api_key else None
+
         # Initialiser les 3 agents
-        self.auditor = AuditorAgent(model_name=model_name)
-        self.fixer = FixerAgent(model_name=model_name)
+        self.auditor = AuditorAgent(model_name=model_name, client=self.llm_client)
+        self.fixer = FixerAgent(model_name=model_name, max_concurrency=max_concurrency, client=self.llm_client)
         self.judge = JudgeAgent(model_name=model_name)
-        self.test_generator = TestGeneratorAgent(model_name=model_name)
+        self.test_generator = TestGeneratorAgent(
+            model_name=model_name, max_concurrency=max_concurrency, client=self.llm_client
+        )
+
+        # Génération de tests lancée pendant l'audit (voir _auditor_node)
+        self._test_generation: Optional[Future] = None
+
+        # Résultats du Judge par empreinte du contenu des fichiers Python (vidé à chaque run)
+        self._judge_cache: Dict[str, Dict] = {}
 
         # Créer le graphe d'exécution
-        self.workflow = self._build_workflow_graph()
+        # Topologie fixe : compilée une seule fois par classe, partagée par toutes les instances
+        self.workflow = type(self)._build_workflow_graph()
 
         print("\nGraphe LangGraph créé!")
         print("Noeuds: Auditor -> TestGenerator -> Judge -> Fixer -> (Loop to Judge)")
         print()
 
-    def _build_workflow_graph(self) -> StateGraph:
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _build_workflow_graph(cls) -> StateGraph:
         """
         Construit le graphe d'exécution avec LangGraph
+
+        Les noeuds ne capturent aucune instance : l'orchestrateur courant leur est transmis
+        dans la configuration d'exécution (voir _bind_node et _run_config).
         """
         # Créer un nouveau graphe d'états
         workflow = StateGraph(RefactoringState)
@@ -111,24 +157,31 @@ class LangGraphOrchestrator:
         # ===== DÉFINIR LES NOEUDS =====
 
         # Noeud 1: Auditor (analyse)
-        workflow.add_node("auditor", self._auditor_node)
+        workflow.add_node("auditor", cls._bind_node("_auditor_node"))
 
         # Noeud 2: Fixer (correction)
-        workflow.add_node("fixer", self._fixer_node)
+        workflow.add_node("fixer", cls._bind_node("_fixer_node"))
 
         # Noeud 2.5: TestGenerator (generation de tests unitaires)
-        workflow.add_node("test_generator", self._test_generator_node)
+        workflow.add_node("test_generator", cls._bind_node("_test_generator_node"))
 
         # Noeud 3: Judge (test et validation)
-        workflow.add_node("judge", self._judge_node)
+        workflow.add_node("judge", cls._bind_node("_judge_node"))
 
         # ===== DÉFINIR LES TRANSITIONS =====
 
         # START -> Auditor (toujours commencer par l'analyse)
         workflow.set_entry_point("auditor")
 
-        # Auditor -> TestGenerator (plans -> tests)
-        workflow.add_edge("auditor", "test_generator")
+        # Auditor -> TestGenerator (plans -> tests), ou directement Fixer après un nouvel audit
+        workflow.add_conditional_edges(
+            "auditor",
+            cls._after_audit,
+            {
+                "test_generator": "test_generator",
+                "fixer": "fixer"
+            }
+        )
         
         # TestGenerator -> Judge (tests -> validation initiale)
         workflow.add_edge("test_generator", "judge")
@@ -136,24 +189,50 @@ class LangGraphOrchestrator:
         # Judge -> ? (transition conditionnelle)
         workflow.add_conditional_edges(
             "judge",
-            self._should_continue_or_stop,  
+            cls._should_continue_or_stop,  
             {
-                "continue": "fixer",  # Si échec -> Fixer
-                "stop": END           # Si succès -> Fin
+                "continue": "fixer",     # Si échec -> Fixer
+                "re-audit": "auditor",   # Si le plan est devenu obsolète -> nouvel audit
+                "stop": END              # Si succès -> Fin
             }
         )
 
-        # Fixer -> Judge (correction -> re-validation)
-        workflow.add_edge("fixer", "judge")
+        # Fixer -> Judge (correction -> re-validation), sauf si aucun fichier n'a été modifié
+        workflow.add_conditional_edges(
+            "fixer",
+            cls._after_fix,
+            {
+                "judge": "judge",
+                "stop": END
+            }
+        )
 
         # Compiler le graphe
         app = workflow.compile()
 
         return app
 
+    @staticmethod
+    def _bind_node(method_name: str):
+        """
+        Noeud du graphe partagé qui délègue à la méthode de l'orchestrateur en cours d'exécution
+        """
+        def node(state: RefactoringState, config: Dict) -> Dict:
+            orchestrator = config["configurable"]["orchestrator"]
+            return getattr(orchestrator, method_name)(state)
+
+        node.__name__ = method_name
+        return node
+
+    def _run_config(self) -> Dict:
+        """
+        Configuration d'exécution du graphe : désigne l'instance dont les agents sont utilisés
+        """
+        return {"configurable": {"orchestrator": self}}
+
     # ===== FONCTIONS DES NOEUDS =====
 
-    def _auditor_node(self, state: RefactoringState) -> RefactoringState:
+    def _auditor_node(self, state: RefactoringState) -> Dict:
         """
         Noeud Auditor: Analyse tous les fichiers Python
         """
@@ -161,40 +240,68 @@ class LangGraphOrchestrator:
         print("NOEUD: AUDITOR (Analyse)")
         print("=" * 30)
 
-        # Exécuter l'analyse
-        refactoring_plan = self.auditor.analyze(Path(state["target_dir"]))
+        # Liste des fichiers figée avant que les tests générés n'apparaissent
+        # (lors d'un nouvel audit, les tests déjà générés sont exclus)
+        python_files = [
+            f for f in list_files(state["target_dir"])
+            if not Path(f).name.startswith("test_")
+        ]
+
+        # Le projet fournit déjà ses tests : pas de génération (ni d'appels LLM)
+        skip_generation = (
+            not state.get("tests_generated")
+            and self.min_existing_tests > 0
+            and self._count_test_files(state["target_dir"]) >= self.min_existing_tests
+        )
 
-        # Mettre à jour l'état
-        state["refactoring_plan"] = refactoring_plan
-        state["audit_completed"] = True
-        state["current_iteration"] = 1
+        # Les tests ne dépendent pas du plan : leur génération (appels LLM) se fait
+        # pendant l'appel LLM de l'Auditor au lieu d'attendre la fin de l'audit
+        if not state.get("tests_generated") and not skip_generation:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="test_generator")
+            self._test_generation = executor.submit(
+                self.test_generator.generate_unit_tests, state["target_dir"])
+            executor.shutdown(wait=False)
 
-        return state
+        # Exécuter l'analyse
+        refactoring_plan = self.auditor.analyze(Path(state["target_dir"]), python_files=python_files)
+
+        # Seules les clés modifiées sont renvoyées (LangGraph les fusionne dans l'état)
+        update = {
+            "refactoring_plan": refactoring_plan,
+            "audit_completed": True,
+            # Nouvel audit : le plan vaut pour l'itération du prochain passage du Fixer
+            "audit_iteration": state["current_iteration"] + 1 if state.get("audit_completed") else 1,
+        }
+        if skip_generation:
+            print(f"Existing tests found in {state['target_dir']}: test generation skipped.")
+            update["tests_generated"] = True
+        return update
 
-    def _fixer_node(self, state: RefactoringState) -> RefactoringState:
+    def _fixer_node(self, state: RefactoringState) -> Dict:
         """
         Noeud Fixer: Corrige le code selon le plan
         """
         print("\n" + "=" * 30)
         print(
-            f"NOEUD: FIXER (Correction - Iteration {state['current_iteration']})")
+            f"NOEUD: FIXER (Correction - Iteration {state['current_iteration'] + 1})")
         print("=" * 30)
 
         refactoring_plan = state["refactoring_plan"]
-        iteration = state["current_iteration"]
 
         # Exécuter la correction
         fix_results = self.fixer.fix_code(
             refactoring_plan, test_errors=state.get("error_feedback"))
 
-        # Mettre à jour l'état
-        state["fix_results"] = fix_results
-        state["fix_completed"] = True
-        # Note: current_iteration est incrémenté dans _should_continue_or_stop
-
-        return state
+        # Chaque passage du Fixer ouvre une nouvelle itération de la boucle.
+        # Aucun fichier modifié : le Judge rendrait le même verdict, la boucle s'arrête
+        return {
+            "fix_results": fix_results,
+            "fix_completed": True,
+            "current_iteration": state["current_iteration"] + 1,
+            "stalled": not fix_results.get("files_modified"),
+        }
 
-    def _test_generator_node(self, state: RefactoringState) -> RefactoringState:
+    def _test_generator_node(self, state: RefactoringState) -> Dict:
         """
         Noeud TestGenerator: Génère des tests unitaires pour le code (une seule fois)
         """
@@ -204,19 +311,23 @@ class LangGraphOrchestrator:
             print("\n" + "=" * 30)
             print("NOEUD: TEST GENERATOR (Skipped - Already Generated)")
             print("=" * 30)
-            return state
+            return {}
 
         print("\n" + "=" * 30)
         print("NOEUD: TEST GENERATOR (Test Creation)")
         print("=" * 30)
         
-        target_dir = state["target_dir"]
-        self.test_generator.generate_unit_tests(target_dir)
+        if self._test_generation is not None:
+            # Démarrée pendant l'audit : on attend simplement qu'elle se termine
+            generation, self._test_generation = self._test_generation, None
+            generation.result()
+        else:
+            target_dir = state["target_dir"]
+            self.test_generator.generate_unit_tests(target_dir)
         
-        state["tests_generated"] = True
-        return state
+        return {"tests_generated": True}
         
-    def _judge_node(self, state: RefactoringState) -> RefactoringState:
+    def _judge_node(self, state: RefactoringState) -> Dict:
         """
         Noeud Judge: Teste et valide le code corrigé
         """
@@ -226,47 +337,69 @@ class LangGraphOrchestrator:
 
         target_dir = Path(state["target_dir"])
 
-        # Exécuter les tests
-        test_results = self.judge.run_tests(target_dir)
-
-        # Mettre à jour l'état
-        state["test_results"] = test_results
-        state["tests_passed"] = test_results.get("status") == "success"
-
-        # Si tests échouent, préparer le feedback pour le prochain cycle
-        if not state["tests_passed"]:
-            # Recupérer uniquement les tests echoués
-            failing_tests = test_results.get("failing_tests", [])
-            
-            # Formater le feedback avec SEULEMENT les tests echoués
-            feedback_messages = []
-            if failing_tests:
-                feedback_messages.append("TEST FAILURES (Fix these SPECIFIC errors):")
-                for failure in failing_tests:
-                    feedback_messages.append(f"""
+        # Même contenu que lors d'un jugement précédent : même verdict, pytest n'est pas relancé
+        workspace_hash = self._workspace_hash(target_dir)
+        update = {
+            "stalled": workspace_hash == state.get("workspace_hash"),
+            "workspace_hash": workspace_hash,
+        }
+
+        cached_results = self._judge_cache.get(workspace_hash) if self.judge_cache_enabled else None
+        if cached_results is not None:
+            print("Judge: Workspace unchanged since a previous run, reusing its results.")
+            test_results = cached_results
+        else:
+            # Après le Fixer, seuls les fichiers réécrits (et les tests qui en dépendent) sont revérifiés
+            changed = state["fix_results"].get("written_files") if state.get("fix_completed") else None
+
+            # Exécuter les tests
+            test_results = self.judge.run_tests(target_dir, changed=changed)
+            if self.judge_cache_enabled:
+                self._judge_cache[workspace_hash] = test_results
+
+        # Mettre à jour l'état (verdict repris du cache ou non : le feedback correspond
+        # toujours au contenu actuel, et il est effacé quand les tests passent)
+        update["test_results"] = test_results
+        update["tests_passed"] = test_results.get("status") == "success"
+        update["error_feedback"] = (
+            None if update["tests_passed"] else self._format_error_feedback(test_results)
+        )
+
+        return update
+
+    @staticmethod
+    def _format_error_feedback(test_results: Dict) -> str:
+        """
+        Feedback transmis au Fixer pour le prochain cycle : uniquement les tests échoués
+        """
+        failing_tests = test_results.get("failing_tests", [])
+
+        # Formater le feedback avec SEULEMENT les tests echoués
+        feedback_messages = []
+        if failing_tests:
+            feedback_messages.append("TEST FAILURES (Fix these SPECIFIC errors):")
+            for failure in failing_tests:
+                feedback_messages.append(f"""
 - File: {failure.get('file', 'unknown')}
 - Test: {failure.get('test', 'unknown')}
 - Error: {failure.get('error', 'No error message')}
 """)
-            
-            # Si on a des erreurs Pylint (stockées dans failing_tests pour le moment par JudgeAgent)
-            # Elles seront incluses car _extract_failures les gère ou Judge les y met
-            
-            state["error_feedback"] = "\n".join(feedback_messages)
-            
-            # Injecter les erreurs dans le plan pour le Fixer
-            state["refactoring_plan"]["errors"] = state["error_feedback"]
 
-        return state
+        # Si on a des erreurs Pylint (stockées dans failing_tests pour le moment par JudgeAgent)
+        # Elles seront incluses car _extract_failures les gère ou Judge les y met
+
+        # Transmis au Fixer à part (fin de prompt) : le plan de l'Auditor reste inchangé
+        return "\n".join(feedback_messages)
 
     # ===== FONCTION DE DÉCISION =====
 
-    def _should_continue_or_stop(self, state: RefactoringState) -> str:
+    @staticmethod
+    def _should_continue_or_stop(state: RefactoringState) -> str:
         """
         Décide si on continue le loop ou si on s'arrête
 
         Cette fonction est appelée après le noeud Judge pour déterminer
-        la prochaine étape.
+        la prochaine étape. Elle ne modifie pas l'état (le Fixer incrémente l'itération).
         """
         tests_passed = state["tests_passed"]
         current_iteration = state["current_iteration"]
@@ -275,36 +408,92 @@ class LangGraphOrchestrator:
         if tests_passed:
             # Tous les tests passent -> Succès!
             print(f"\\nDECISION: STOP (Tests successful)")
-            state["should_continue"] = False
+            return "stop"
+
+        elif state.get("stalled"):
+            # Le Fixer n'a modifié aucun fichier : les itérations suivantes donneraient le même résultat
+            print(f"\nDECISION: STOP (No changes since the previous iteration)")
             return "stop"
 
         elif current_iteration >= max_iterations:
             # Max itérations atteint -> Échec
             print(f"\nDECISION: STOP (Max iterations: {max_iterations})")
-            state["should_continue"] = False
             return "stop"
 
+        elif (current_iteration > state.get("audit_iteration", 1)
+                and _STRUCTURAL_ERROR_RE.search(state.get("error_feedback") or "")):
+            # Le Fixer a cassé des imports ou la syntaxe depuis l'audit : le plan ne décrit plus le code
+            print(
+                f"\nDECISION: RE-AUDIT (Iteration {current_iteration + 1}/{max_iterations})")
+            return "re-audit"
+
         else:
             # Continuer le loop
             print(
                 f"\nDECISION: CONTINUE (Iteration {current_iteration + 1}/{max_iterations})")
-            state["current_iteration"] += 1
-            state["should_continue"] = True
             return "continue"
 
+    @staticmethod
+    def _after_fix(state: RefactoringState) -> str:
+        """
+        Après le Fixer : re-validation par le Judge, ou arrêt si rien n'a changé
+        """
+        if state.get("stalled"):
+            print(f"\nDECISION: STOP (Fixer produced no changes)")
+            return "stop"
+        return "judge"
+
+    @staticmethod
+    def _after_audit(state: RefactoringState) -> str:
+        """
+        Après le premier audit on génère les tests ; après un nouvel audit on corrige directement
+        """
+        return "fixer" if state.get("fix_completed") else "test_generator"
+
     # ===== MÉTHODE PRINCIPALE =====
 
+    @staticmethod
+    def _count_test_files(target_dir: str) -> int:
+        """
+        Nombre de fichiers test_*.py à la racine du répertoire cible (là où le TestGenerator écrit)
+
+        Les fichiers test_<module>.py d'un module présent à la racine sont ceux qu'écrit le
+        TestGenerator (lors d'une exécution précédente) : ils ne comptent pas, sinon une
+        nouvelle exécution garderait des tests générés pour l'ancien code.
+        """
+        with os.scandir(target_dir) as entries:
+            python_files = {
+                entry.name for entry in entries
+                if entry.name.endswith(".py") and entry.is_file()
+            }
+        return sum(
+            1 for name in python_files
+            if name.startswith("test_") and name[len("test_"):] not in python_files
+        )
+
+    @staticmethod
+    def _workspace_hash(target_dir: Path) -> str:
+        """
+        Empreinte du contenu de tous les fichiers Python (tests compris) du répertoire cible
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for root, dirs, files in os.walk(target_dir):
+            # Dossiers cachés (.backups...) et caches ignorés, parcours dans un ordre stable
+            dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d != "__pycache__")
+            for name in sorted(files):
+                if name.endswith(".py"):
+                    path = os.path.join(root, name)
+                    digest.update(os.path.relpath(path, target_dir).encode("utf-8") + b"\0")
+                    with open(path, "rb") as f:
+                        digest.update(hashlib.blake2b(f.read(), digest_size=16).digest())
+        return digest.hexdigest()
+
     def discover_python_files(self, target_dir: Path) -> List[Path]:
         """
         Découvre tous les fichiers Python dans le répertoire cible
         """
-        python_files = list(target_dir.rglob("*.py"))
-
-        # Filtrer les fichiers de test et __init__.py
-        python_files = [
-            f for f in python_files
-            if not f.name.startswith("test_") and f.name != "__init__.py"
-        ]
+        # Parcours os.scandir : tests, __init__.py et dossiers cachés (.backups...) exclus
+        python_files = [Path(f) for f in iter_python_sources(str(target_dir))]
 
         print(f"Python files discovered: {len(python_files)}")
         for f in python_files:
@@ -329,6 +518,38 @@ class LangGraphOrchestrator:
         """
         Point d'entrée principal: exécute le graphe LangGraph
         """
+        prepared = self._prepare_run(target_dir)
+        if "initial_state" not in prepared:
+            return prepared
+
+        try:
+            # Invoquer le graphe avec l'état initial
+            final_state = self.workflow.invoke(prepared["initial_state"], config=self._run_config())
+            return self._finalize_run(final_state, prepared["python_files"])
+        except Exception as e:
+            return self._handle_run_error(e)
+
+    async def arun(self, target_dir: str) -> Dict:
+        """
+        Variante asynchrone de run: plusieurs orchestrations peuvent partager une boucle d'événements
+
+        Les noeuds restent synchrones : LangGraph les exécute dans un thread sous ainvoke,
+        la boucle n'est donc pas bloquée pendant les appels LLM et les sous-processus.
+        """
+        prepared = self._prepare_run(target_dir)
+        if "initial_state" not in prepared:
+            return prepared
+
+        try:
+            final_state = await self.workflow.ainvoke(prepared["initial_state"], config=self._run_config())
+            return self._finalize_run(final_state, prepared["python_files"])
+        except Exception as e:
+            return self._handle_run_error(e)
+
+    def _prepare_run(self, target_dir: str) -> Dict:
+        """
+        Valide le répertoire cible et construit l'état initial du graphe
+        """
         target_path = Path(target_dir)
 
         # Validation du répertoire
@@ -339,6 +560,9 @@ class LangGraphOrchestrator:
 
         print(f"Target directory: {target_path.absolute()}\n")
 
+        # Verdicts d'un run précédent : l'environnement a pu changer entre-temps
+        self._judge_cache.clear()
+
         # Découvrir les fichiers Python
         python_files = self.discover_python_files(target_path)
 
@@ -348,10 +572,9 @@ class LangGraphOrchestrator:
         # ===== INITIALISER L'ÉTAT =====
         initial_state: RefactoringState = {
             "target_dir": str(target_path),
-            "python_files": python_files,
-            "tools": self.tools,
             "refactoring_plan": {},
             "audit_completed": False,
+            "audit_iteration": 1,
             "tests_generated": False,
             "fix_results": {},
             "fix_completed": False,
@@ -361,6 +584,8 @@ class LangGraphOrchestrator:
             "error_feedback": None,
             "max_iterations": self.max_iterations,
             "should_continue": True,
+            "workspace_hash": None,
+            "stalled": False,
             "final_result": {}
         }
 
@@ -368,70 +593,88 @@ class LangGraphOrchestrator:
         print("EXECUTION OF LANGGRAPH")
         print("=" * 60)
 
-        # ===== EXÉCUTER LE GRAPHE =====
-        try:
-            # Invoquer le graphe avec l'état initial
-            final_state = self.workflow.invoke(initial_state)
-
-            # Construire le résultat final
-            tests_passed = final_state["tests_passed"]
-            iteration = final_state["current_iteration"]
-            test_results = final_state["test_results"]
-
-            if tests_passed:
-                print("\n" + "=" * 30)
-                print("SUCCESS: All tests pass!")
-                print("=" * 30)
-                print(f"   • Iterations needed: {iteration}")
-
-                final_result = {
-                    "success": True,
-                    "iterations_needed": iteration,
-                    "test_result": test_results
-                }
-            else:
-                print("\n" + "=" * 30)
-                print(
-                    f"FAILURE: Max iterations reached ({self.max_iterations})")
-                print("=" * 30)
-
-                final_result = {
-                    "success": False,
-                    "iterations_needed": self.max_iterations,
-                    "reason": "Max iterations reached",
-                    "last_test_result": test_results
-                }
+        return {"initial_state": initial_state, "python_files": python_files}
 
-            # Logger le résultat final
-            log_experiment(
-                agent_name="LangGraph_Orchestrator",
-                model_used=self.model_name,
-                action=ActionType.ANALYSIS,
-                details={
-                    "target_directory": str(target_path),
-                    "input_prompt": f"Orchestration LangGraph sur {len(python_files)} fichiers avec RefactoringTools",
-                    "output_response": f"Succès: {tests_passed}, Itérations: {iteration}",
-                    "total_files": len(python_files),
-                    "max_iterations": self.max_iterations,
-                    "final_result": final_result,
-                    "graph_execution": "LangGraph workflow completed",
-                    "tools_used": {
-                        "sandbox_path": self.sandbox_info['sandbox_path'],
-                        "backups_created": self.sandbox_info['backups_available'],
-                        "test_files": self.sandbox_info['test_files']
-                    }
-                },
-                status="SUCCESS" if tests_passed else "FAILED"
-            )
-
-            return final_result
+    def _finalize_run(self, final_state: RefactoringState, python_files: List[Path]) -> Dict:
+        """
+        Construit et journalise le résultat final à partir de l'état final du graphe
+        """
+        target_path = Path(final_state["target_dir"])
 
-        except Exception as e:
-            print(f"\nError executing the graph: {e}")
-            import traceback
-            traceback.print_exc()
+        # Construire le résultat final
+        tests_passed = final_state["tests_passed"]
+        iteration = final_state["current_iteration"]
+        test_results = final_state["test_results"]
+
+        if tests_passed:
+            print("\n" + "=" * 30)
+            print("SUCCESS: All tests pass!")
+            print("=" * 30)
+            print(f"   • Iterations needed: {iteration}")
+
+            final_result = {
+                "success": True,
+                "iterations_needed": iteration,
+                "test_result": test_results
+            }
+        elif final_state.get("stalled"):
+            print("\n" + "=" * 30)
+            print(f"FAILURE: No progress after iteration {iteration}")
+            print("=" * 30)
+
+            final_result = {
+                "success": False,
+                "iterations_needed": iteration,
+                "reason": "Fixer made no further changes",
+                "last_test_result": test_results
+            }
+        else:
+            print("\n" + "=" * 30)
+            print(
+                f"FAILURE: Max iterations reached ({self.max_iterations})")
+            print("=" * 30)
 
-            return {
+            final_result = {
                 "success": False,
-                "error": str(e)
+                "iterations_needed": self.max_iterations,
+                "reason": "Max iterations reached",
+                "last_test_result": test_results
             }
+
+        # Logger le résultat final
+        log_experiment(
+            agent_name="LangGraph_Orchestrator",
+            model_used=self.model_name,
+            action=ActionType.ANALYSIS,
+            details={
+                "target_directory": str(target_path),
+                "input_prompt": f"Orchestration LangGraph sur {len(python_files)} fichiers avec RefactoringTools",
+                "output_response": f"Succès: {tests_passed}, Itérations: {iteration}",
+                "total_files": len(python_files),
+                "max_iterations": self.max_iterations,
+                "final_result": final_result,
+                "graph_execution": "LangGraph workflow completed",
+                "tools_used": {
+                    "sandbox_path": self.sandbox_info['sandbox_path'],
+                    "backups_created": self.sandbox_info['backups_available'],
+                    "test_files": self.sandbox_info['test_files']
+                }
+            },
+            status="SUCCESS" if tests_passed else "FAILED"
+        )
+
+        return final_result
+
+    @staticmethod
+    def _handle_run_error(e: Exception) -> Dict:
+        """
+        Affiche l'erreur d'exécution du graphe et la renvoie comme résultat
+        """
+        print(f"\nError executing the graph: {e}")
+        import traceback
+        traceback.print_exc()
+
+        return {
+            "success": False,
+            "error": str(e)
+        }
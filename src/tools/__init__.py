@@ -5,6 +5,7 @@ Provides the Internal API for The Refactoring Swarm agents.
 """
 
 from .refactoring_tools import RefactoringTools
+from .registry import get_tools, set_tools
 from .tool_wrapper import ToolWrapper
 
-__all__ = ['RefactoringTools', 'ToolWrapper']
+__all__ = ['RefactoringTools', 'ToolWrapper', 'get_tools', 'set_tools']
@@ -4,20 +4,15 @@ Analysis Tools - Static analysis tools for code quality assessment
 Provides analysis capabilities for the Auditor agent.
 """
 
-from typing import Dict
-from src.tools.refactoring_tools import RefactoringTools
+from typing import Dict, List
+from src.tools.refactoring_tools import RefactoringTools, pylint_version
+from src.tools.registry import get_tools
 
 
-# Global tools instance
-_tools = None
-
 
 def _get_tools() -> RefactoringTools:
-    """Get or create the global tools instance."""
-    global _tools
-    if _tools is None:
-        _tools = RefactoringTools(base_sandbox="./sandbox")
-    return _tools
+    """Get the tools instance shared through the registry."""
+    return get_tools()
 
 
 def run_pylint(file_path: str) -> Dict:
@@ -52,3 +47,28 @@ def run_pylint(file_path: str) -> Dict:
 
     # Return the result as-is (already structured for LLM consumption)
     return result
+
+
+def run_pylint_batch(file_paths: List[str]) -> Dict[str, Dict]:
+    """
+    Run pylint once on several files.
+
+    Args:
+        file_paths: Paths to the Python files (relative to sandbox)
+
+    Returns:
+        Dictionary mapping each file path to a result shaped like run_pylint()
+
+    Raises:
+        FileNotFoundError: If a file doesn't exist
+        PermissionError: If a file is outside sandbox
+    """
+    tools = _get_tools()
+    result = tools.run_pylint_batch(file_paths)
+
+    if not result["success"]:
+        if "outside sandbox" in result.get("error", ""):
+            raise PermissionError(result["error"])
+        raise FileNotFoundError(result["error"])
+
+    return result["results"]
@@ -4,21 +4,24 @@ File Operations - Wrapper around RefactoringTools for file operations
 Provides simplified file operations for agents while maintaining sandbox security.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional
 from src.tools.refactoring_tools import RefactoringTools
+from src.tools.registry import get_tools
 
 
-# Global tools instance
-_tools = None
+# Shared pool for bulk reads (reused across calls, not one per file)
+_reader = None
+
+# Directories never walked for sources, in addition to hidden ones (.git, .venv, .backups...)
+PRUNED_DIRS = frozenset({"__pycache__", "venv", "node_modules"})
 
 
 def _get_tools() -> RefactoringTools:
-    """Get or create the global tools instance."""
-    global _tools
-    if _tools is None:
-        _tools = RefactoringTools(base_sandbox="./sandbox")
-    return _tools
+    """Get the tools instance shared through the registry."""
+    return get_tools()
 
 
 def read_file(file_path: str) -> str:
@@ -35,6 +38,7 @@ def read_file(file_path: str) -> str:
         FileNotFoundError: If file doesn't exist
         PermissionError: If file is outside sandbox
     """
+    # Unchanged files are served from RefactoringTools' read cache
     tools = _get_tools()
     result = tools.read_file(file_path)
 
@@ -46,6 +50,34 @@ def read_file(file_path: str) -> str:
     return result["content"]
 
 
+def _get_reader() -> ThreadPoolExecutor:
+    """Get or create the shared reader pool."""
+    global _reader
+    if _reader is None:
+        _reader = ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 1) + 4),
+            thread_name_prefix="read_file",
+        )
+    return _reader
+
+
+def read_files(file_paths: List[str]) -> Dict[str, str]:
+    """
+    Read several files concurrently.
+
+    Args:
+        file_paths: Paths to the files (relative to sandbox)
+
+    Returns:
+        Dictionary mapping each path to its content
+
+    Raises:
+        FileNotFoundError: If a file doesn't exist
+        PermissionError: If a file is outside sandbox
+    """
+    return dict(zip(file_paths, _get_reader().map(read_file, file_paths)))
+
+
 def write_file(file_path: str, content: str, create_backup: bool = False) -> None:
     """
     Write content to a file.
@@ -96,11 +128,46 @@ def list_files(target_dir) -> list:
 
     Returns:
         List of file paths matching *.py pattern
+
+    The listing is memoized by RefactoringTools.list_files (refreshed on
+    writes, on changes at the sandbox root or in the backups, and at least
+    every LISTING_TTL seconds).
     """
-    tools = _get_tools()
-    result = tools.list_files("**/*.py")
+    result = _get_tools().list_files("**/*.py")
 
     if not result["success"]:
         return []
 
     return result["files"]
+
+
+def iter_python_sources(root: str) -> Iterator[str]:
+    """
+    Walk a directory tree and yield its Python source files.
+
+    Test files (test_*.py), __init__.py, hidden directories (.backups,
+    .pytest_cache, .git...) and PRUNED_DIRS (__pycache__, venv...) are skipped.
+    Names are checked on the os.scandir entries, so no Path object or extra
+    stat() is needed for skipped entries. An explicit stack is used instead of
+    recursion, so deep trees do not hit the recursion limit.
+
+    Args:
+        root: Directory to walk
+
+    Yields:
+        Paths of the source files (as strings)
+    """
+    pending = [root]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            subdirs = []
+            for entry in entries:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if not name.startswith(".") and name not in PRUNED_DIRS:
+                        subdirs.append(entry.path)
+                elif (name.endswith(".py") and not name.startswith("test_")
+                      and name != "__init__.py"):
+                    yield entry.path
+        # Reversed so subdirectories are walked in the order scandir listed them
+        pending.extend(reversed(subdirs))
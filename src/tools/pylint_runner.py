@@ -0,0 +1,157 @@
+"""
+Pylint Runner - Per-file pylint reports from a single pylint run
+
+One pylint run over several files yields, for each file, its messages, its
+score and its text report. The score is pylint's own evaluation (configured
+formula, statement count from astroid) applied to the file's statistics, and
+the text report is what `pylint <file>` prints for that file alone.
+
+Used in-process by RefactoringTools, or run as a script (paths as arguments,
+reports printed as JSON) when the in-process linter is busy.
+"""
+
+import io
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+# Script exit code when pylint cannot be imported by the interpreter
+EXIT_NOT_INSTALLED = 3
+
+
+def lint_files(paths: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Run pylint on several files and split its results per file.
+
+    pylint keeps its statistics per module name, so files sharing a basename
+    are analyzed in separate runs.
+
+    Args:
+        paths: Paths of the files to analyze
+
+    Returns:
+        Dictionary mapping each analyzed file's resolved path to:
+            - messages (list): Messages shaped like pylint's JSON report entries
+            - statements (int): Statements counted by pylint
+            - score (float): pylint's evaluation of the file (None without statements)
+            - raw_output (str): Text report of the file
+
+    Raises:
+        ImportError: If pylint is not installed
+    """
+    runs: List[List[str]] = []
+    for path in paths:
+        name = os.path.basename(path)
+        for run_paths in runs:
+            if all(os.path.basename(other) != name for other in run_paths):
+                run_paths.append(path)
+                break
+        else:
+            runs.append([path])
+
+    reports: Dict[str, Dict[str, Any]] = {}
+    for run_paths in runs:
+        reports.update(_lint_run(run_paths))
+    return reports
+
+
+def _lint_run(paths: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Run pylint once on files with distinct basenames (see lint_files)."""
+    from pylint.lint import Run
+    from pylint.reporters.text import TextReporter
+    from pylint.reporters.ureports.nodes import EvaluationSection
+    from pylint.reporters.ureports.text_writer import TextWriter
+
+    class _FileReporter(TextReporter):
+        """Text reporter writing each module's messages to its own buffer."""
+        name = "per-file"
+
+        def __init__(self):
+            super().__init__(io.StringIO())
+            # resolved file path -> {"module", "out", "messages"}
+            self.files: Dict[str, Dict[str, Any]] = {}
+
+        def _file(self, module: str, filepath: Optional[str]) -> Optional[Dict[str, Any]]:
+            if not filepath:
+                return None
+            return self.files.setdefault(
+                os.path.realpath(filepath),
+                {"module": module, "out": io.StringIO(), "messages": []})
+
+        def on_set_current_module(self, module: str, filepath: Optional[str]) -> None:
+            super().on_set_current_module(module, filepath)
+            self._file(module, filepath)
+
+        def handle_message(self, msg) -> None:
+            entry = self._file(msg.module, msg.abspath)
+            if entry is None:
+                # Not tied to an analyzed file (e.g. a configuration problem)
+                return
+            self.out = entry["out"]
+            super().handle_message(msg)
+            entry["messages"].append(msg)
+
+        def _display(self, layout) -> None:
+            # Reports and the global evaluation are replaced by per-file evaluations
+            pass
+
+    reporter = _FileReporter()
+    run = Run([*paths], reporter=reporter, exit=False)
+    linter = run.linter
+
+    reports = {}
+    for path, entry in reporter.files.items():
+        stats = linter.stats.by_module.get(entry["module"], {})
+        statements = stats.get("statement", 0)
+        score = None
+        out = entry["out"]
+        if statements:
+            # Same evaluation as pylint's global note, on this module's counts
+            evaluation_vars = {
+                key: stats.get(key, 0)
+                for key in ("fatal", "error", "warning", "refactor", "convention", "info")
+            }
+            evaluation_vars["statement"] = statements
+            try:
+                score = round(float(eval(linter.config.evaluation, {}, evaluation_vars)), 2)  # pylint: disable=eval-used
+            except Exception:  # pylint: disable=broad-except
+                score = None
+            else:
+                print(file=out)
+                TextWriter().format(
+                    EvaluationSection(f"Your code has been rated at {score:.2f}/10"), out)
+
+        reports[path] = {
+            "messages": [
+                {
+                    "type": msg.category,
+                    "module": msg.module,
+                    "obj": msg.obj,
+                    "line": msg.line,
+                    "column": msg.column,
+                    "endLine": msg.end_line,
+                    "endColumn": msg.end_column,
+                    "path": msg.path,
+                    "symbol": msg.symbol,
+                    "message": msg.msg,
+                    "message-id": msg.msg_id,
+                }
+                for msg in entry["messages"]
+            ],
+            "statements": statements,
+            "score": score,
+            "raw_output": out.getvalue(),
+        }
+    return reports
+
+
+if __name__ == "__main__":
+    # Run as a script: this directory must not shadow the analyzed code's imports
+    if sys.path and os.path.realpath(sys.path[0]) == os.path.dirname(os.path.realpath(__file__)):
+        del sys.path[0]
+    try:
+        result = lint_files(sys.argv[1:])
+    except ImportError:
+        sys.exit(EXIT_NOT_INSTALLED)
+    sys.stdout.write(json.dumps(result))
@@ -0,0 +1,252 @@
+"""
+Pytest Worker - Resident process that starts pytest sessions without paying
+the interpreter, pytest and plugin imports on every run
+
+The worker imports pytest and its plugins once, then forks a fresh child for
+each session. The code under test is therefore always imported anew (the
+Fixer rewrites it between runs): only pytest itself stays warm.
+
+POSIX only (os.fork); callers fall back to a pytest subprocess when the
+worker is unavailable.
+"""
+
+import atexit
+import json
+import os
+import select
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+from typing import BinaryIO, List, Optional, Tuple
+
+
+# Bytes of a session output kept in memory: beyond, only its start (collection
+# errors, first failures) and its end (short summary, counts) are read
+OUTPUT_LIMIT = 2 << 20
+
+
+# Resident side: preload pytest and its entry-point plugins, then one forked
+# child per request line. The reply is the child's exit code.
+_SERVER_SCRIPT = r"""
+import importlib, json, os, sys
+from importlib import metadata
+
+# Same import path as the pytest script: the worker's cwd is not importable
+if sys.path and sys.path[0] == "":
+    del sys.path[0]
+
+import pytest
+for entry_point in metadata.entry_points(group="pytest11"):
+    try:
+        importlib.import_module(entry_point.module)
+    except Exception:
+        pass
+
+sys.stdout.write("ready\n")
+sys.stdout.flush()
+
+for line in sys.stdin:
+    request = json.loads(line)
+    pid = os.fork()
+    if pid == 0:
+        code = 3
+        try:
+            stdin = os.open(os.devnull, os.O_RDONLY)
+            stdout = os.open(request["stdout"], os.O_WRONLY | os.O_TRUNC)
+            stderr = os.open(request["stderr"], os.O_WRONLY | os.O_TRUNC)
+            os.dup2(stdin, 0)
+            os.dup2(stdout, 1)
+            os.dup2(stderr, 2)
+            os.chdir(request["cwd"])
+            code = int(pytest.main(request["args"]))
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    sys.stdout.write(json.dumps({"code": os.waitstatus_to_exitcode(status)}) + "\n")
+    sys.stdout.flush()
+"""
+
+
+class PytestWorker:
+    """
+    Client of the resident pytest process (started on first use).
+
+    One session at a time: a concurrent caller gets None and runs pytest
+    in its own subprocess instead.
+    """
+
+    def __init__(self):
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def supported() -> bool:
+        """Whether the platform can fork the resident process."""
+        return hasattr(os, "fork")
+
+    def run(self, args: List[str], cwd: str, timeout: float) -> Optional[Tuple[int, str, str]]:
+        """
+        Run one pytest session in a child of the resident process.
+
+        Args:
+            args: pytest arguments (without the "pytest" program name)
+            cwd: Working directory of the session
+            timeout: Time limit of the session, in seconds
+
+        Returns:
+            Tuple (return code, stdout, stderr), or None if the worker is
+            unavailable (busy, unsupported or failed to start)
+
+        Raises:
+            subprocess.TimeoutExpired: If the session exceeds the timeout
+                (the worker is then stopped and restarted on next use)
+        """
+        if not self.supported() or not self._lock.acquire(blocking=False):
+            return None
+        try:
+            process = self._ensure_started(timeout)
+            if process is None:
+                return None
+
+            outputs = []
+            try:
+                for _ in range(2):
+                    fd, path = tempfile.mkstemp(prefix="pytest-", suffix=".log")
+                    os.close(fd)
+                    outputs.append(path)
+
+                request = {"args": args, "cwd": cwd, "stdout": outputs[0], "stderr": outputs[1]}
+                try:
+                    process.stdin.write(json.dumps(request) + "\n")
+                    process.stdin.flush()
+                    reply = self._read_line(process, timeout)
+                except (OSError, ValueError):
+                    self._stop()
+                    return None
+
+                if reply is None:
+                    self._stop()
+                    raise subprocess.TimeoutExpired(["pytest", *args], timeout)
+                if not reply:
+                    # Resident process died: start a new one next time
+                    self._stop()
+                    return None
+
+                code = json.loads(reply)["code"]
+                stdout, stderr = (self._read_output(path) for path in outputs)
+                return code, stdout, stderr
+            finally:
+                for path in outputs:
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+        finally:
+            self._lock.release()
+
+    def _ensure_started(self, timeout: float) -> Optional[subprocess.Popen]:
+        """Start the resident process if needed and wait until pytest is loaded."""
+        if self._process is not None and self._process.poll() is None:
+            return self._process
+
+        try:
+            process = subprocess.Popen(
+                [sys.executable, "-c", _SERVER_SCRIPT],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                # Own process group: a timed-out session is killed with all its children
+                start_new_session=True,
+            )
+        except OSError:
+            return None
+
+        self._process = process
+        if self._read_line(process, timeout) != "ready\n":
+            # pytest missing from this interpreter, or too slow to load
+            self._stop()
+            return None
+        return process
+
+    @staticmethod
+    def _read_line(process: subprocess.Popen, timeout: float) -> Optional[str]:
+        """Read one reply line ("" if the process ended, None on timeout)."""
+        ready, _, _ = select.select([process.stdout], [], [], timeout)
+        if not ready:
+            return None
+        return process.stdout.readline()
+
+    @staticmethod
+    def _read_output(path: str) -> str:
+        """Content of a session output file (bounded, see read_output)."""
+        with open(path, "rb") as f:
+            return read_output(f)
+
+    def _stop(self) -> None:
+        """Kill the resident process and the session it may be running."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        process.wait()
+
+    def close(self) -> None:
+        """Stop the resident process (end of program)."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            # End of input: the resident loop returns once the current session is done
+            process.stdin.close()
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self._process = process
+            self._stop()
+
+
+def read_output(f: BinaryIO) -> str:
+    """
+    Text of a pytest output file, at most OUTPUT_LIMIT bytes of it.
+
+    A larger output is read as its first and last OUTPUT_LIMIT / 2 bytes
+    around an omission marker, without loading the middle.
+
+    Args:
+        f: Output file, opened in binary mode
+
+    Returns:
+        Decoded output (undecodable bytes replaced)
+    """
+    size = os.fstat(f.fileno()).st_size
+    f.seek(0)
+    if size <= OUTPUT_LIMIT:
+        data = f.read()
+    else:
+        half = OUTPUT_LIMIT // 2
+        head = f.read(half)
+        f.seek(size - half)
+        data = head + b"\n... [%d bytes omitted] ...\n" % (size - 2 * half) + f.read(half)
+    return data.decode("utf-8", errors="replace")
+
+
+# Shared by every RefactoringTools instance of the process
+_worker: Optional[PytestWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_pytest_worker() -> PytestWorker:
+    """Get or create the process-wide pytest worker (stopped at exit)."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = PytestWorker()
+            atexit.register(_worker.close)
+        return _worker
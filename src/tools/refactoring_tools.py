@@ -7,16 +7,175 @@ to safely interact with code files in the sandbox environment.
 Security: All file operations are restricted to the sandbox directory.
 """
 
+import errno
+import fnmatch
+import hashlib
+import importlib.util
 import subprocess
+import sys
+import tempfile
 import os
 import shutil
+import stat
 import json
+import mmap
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from importlib import metadata
 from pathlib import Path
+
+import orjson
 from typing import Dict, Optional, Tuple, List, Any
 from datetime import datetime
+from src.tools import pylint_runner
+from src.tools.pytest_worker import get_pytest_worker, read_output
+from src.utils.cache import get_cache, make_key
+from src.utils.env import get_env
 from src.utils.logger import log_experiment, ActionType
 
 
+# Part of the pylint report cache key: bumped when the shape or scoring of reports changes
+PYLINT_REPORT_FORMAT = "2"
+
+# Files pylint reads its configuration from (current directory, then the sandbox)
+PYLINT_CONFIG_FILES = ("pylintrc", ".pylintrc", "pyproject.toml", "setup.cfg", "tox.ini")
+
+# Files at least this large are decoded straight from a memory map
+MMAP_MIN_BYTES = 1 << 20
+
+# pytest's final summary line ("== 1 failed, 3 passed, 1 warning in 0.12s ==") and its counts
+_PYTEST_SUMMARY_RE = re.compile(r"^=*\s*(\d+ [a-z].*?) in [\d.]+s\b", re.MULTILINE)
+_PYTEST_COUNT_RE = re.compile(r"(\d+) (passed|failed|errors?|skipped)\b")
+PYTEST_SUMMARY_TAIL = 4096
+
+# pytest time limit: base plus an allowance per test file (see _count_test_files)
+PYTEST_BASE_TIMEOUT = 60
+PYTEST_TIMEOUT_PER_FILE = 10
+
+# Memoized file listings are recomputed at least this often (seconds)
+LISTING_TTL = 5
+
+# os.link failures meaning links are not possible there: the backup is a copy instead
+LINK_UNSUPPORTED_ERRNOS = frozenset({errno.EXDEV, errno.EPERM, errno.ENOTSUP, errno.EOPNOTSUPP})
+
+# Larger files are refused by read_file (far beyond what an agent can send to the LLM)
+MAX_READ_BYTES = 8 << 20
+
+# Bytes of file contents kept by read_file (files below MMAP_MIN_BYTES only),
+# least recently read dropped first
+READ_CACHE_MAX_BYTES = 64 << 20
+
+
+# pylint's in-process state (astroid cache, sys.path) is global: one run at a time
+_pylint_lock = threading.Lock()
+
+
+def _evict_project_modules(manager) -> None:
+    """
+    Drop the project's modules from astroid's cache, keep the others.
+
+    Standard library and installed packages (under the interpreter's
+    prefixes) never change during a run: keeping their parsed modules
+    saves rebuilding them on every pylint run, which is most of the cost
+    of re-linting a few rewritten files. Inference caches are cleared, as
+    they may reference nodes of the evicted modules.
+
+    Args:
+        manager: astroid's module manager (astroid.MANAGER)
+    """
+    from astroid.context import _invalidate_cache
+    from astroid.inference_tip import clear_inference_tip_cache
+
+    installed = tuple({
+        os.path.join(os.path.realpath(prefix), "")
+        for prefix in (sys.prefix, sys.base_prefix, sys.exec_prefix)
+    })
+    for name, module in list(manager.astroid_cache.items()):
+        module_file = getattr(module, "file", None)
+        if module_file and not os.path.realpath(module_file).startswith(installed):
+            del manager.astroid_cache[name]
+
+    clear_inference_tip_cache()
+    _invalidate_cache()
+
+
+def _pylint_in_process(paths: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Run pylint inside this interpreter and return its per-file reports.
+
+    Saves the interpreter start-up and the astroid/plugin imports of a
+    subprocess. Only one in-process run can happen at a time: if another
+    thread is already using it (or pylint cannot be imported or fails), None
+    is returned and the caller falls back to a pylint subprocess.
+
+    Args:
+        paths: Absolute paths of the files to analyze
+
+    Returns:
+        Reports of pylint_runner.lint_files, or None
+    """
+    if not _pylint_lock.acquire(blocking=False):
+        return None
+    try:
+        from astroid import MANAGER
+
+        # Files are rewritten between iterations: no stale module from a previous run
+        try:
+            _evict_project_modules(MANAGER)
+        except (ImportError, AttributeError):
+            MANAGER.clear_cache()
+        return pylint_runner.lint_files(paths)
+    except (Exception, SystemExit):
+        return None
+    finally:
+        _pylint_lock.release()
+
+
+def _resolve_in_sandbox(sandbox: str, target_path: str) -> Tuple[str, bool]:
+    """
+    Resolve a path against a sandbox and tell whether it stays inside it.
+
+    Resolved on every call, never memoized: a path checked once may later be
+    replaced by a symlink pointing outside the sandbox. Only the sandbox
+    itself is resolved once (RefactoringTools.__init__).
+
+    Args:
+        sandbox: Resolved sandbox directory
+        target_path: Path relative to the sandbox, or absolute
+
+    Returns:
+        Tuple (resolved path, whether it is the sandbox or below it)
+    """
+    # join keeps an absolute target as is; realpath follows symlinks, so a link
+    # inside the sandbox pointing outside of it is caught
+    full_str = os.path.realpath(os.path.join(sandbox, target_path))
+    inside = full_str == sandbox or full_str.startswith(os.path.join(sandbox, ""))
+    return full_str, inside
+
+
+@lru_cache(maxsize=1)
+def pylint_version() -> str:
+    """Installed pylint version (part of the cache key of pylint reports)."""
+    try:
+        return metadata.version("pylint")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _env_disabled(name: str) -> bool:
+    """Whether an on-by-default feature is turned off (NAME=0/false/no/off, environment or .env)."""
+    return (get_env(name) or "1").strip().lower() in ("0", "false", "no", "off")
+
+
+@lru_cache(maxsize=1)
+def _xdist_available() -> bool:
+    """Whether the pytest-xdist plugin is installed (checked once per process)."""
+    return importlib.util.find_spec("xdist") is not None
+
+
 class RefactoringTools:
     """
     Toolbox for the Refactoring Swarm agents.
@@ -34,6 +193,18 @@ class RefactoringTools:
         """
         self.sandbox_path = Path(base_sandbox).resolve()
         self.backup_dir = self.sandbox_path / ".backups"
+        # Precomputed for _safe_path, called on every file operation
+        self._sandbox_str = str(self.sandbox_path)
+
+        # Memoized list_files / get_sandbox_info / list_backups results: key -> (stamp, result)
+        self._listings: Dict[str, Tuple[Tuple[int, int, int, int], Any]] = {}
+        # Bumped by every write through this instance (see _listing_stamp)
+        self._write_version = 0
+        # read_file contents: path -> ((inode, mtime_ns, size), content, size in bytes)
+        self._reads: "OrderedDict[str, Tuple[Tuple[int, int, int], str, int]]" = OrderedDict()
+        self._reads_bytes = 0
+        # read_file is called from several threads (file_operations.read_files)
+        self._reads_lock = threading.Lock()
 
         # Ensure sandbox exists
         if not self.sandbox_path.exists():
@@ -61,24 +232,17 @@ class RefactoringTools:
         Raises:
             PermissionError: If path is outside the sandbox
         """
-        # Handle both absolute and relative paths
-        if not Path(target_path).is_absolute():
-            full_path = (self.sandbox_path / target_path).resolve()
-        else:
-            full_path = Path(target_path).resolve()
+        full_str, inside = _resolve_in_sandbox(self._sandbox_str, os.fspath(target_path))
 
-        # Check if the resolved path is within sandbox
-        try:
-            full_path.relative_to(self.sandbox_path)
-        except ValueError:
+        if not inside:
             raise PermissionError(
                 f"🚫 SECURITY VIOLATION: Access denied to '{target_path}'\n"
                 f"   Reason: Path is outside the sandbox boundary.\n"
                 f"   Sandbox: {self.sandbox_path}\n"
-                f"   Attempted: {full_path}"
+                f"   Attempted: {full_str}"
             )
 
-        return full_path
+        return Path(full_str)
 
     # ==================== AUDITOR TOOLS (Read-Only) ====================
 
@@ -101,7 +265,10 @@ class RefactoringTools:
         try:
             safe_path = self._safe_path(file_name)
 
-            if not safe_path.exists():
+            # One stat() for existence, type and size
+            try:
+                st = safe_path.stat()
+            except FileNotFoundError:
                 return {
                     "success": False,
                     "error": f"File not found: {file_name}",
@@ -109,7 +276,7 @@ class RefactoringTools:
                     "path": str(safe_path)
                 }
 
-            if not safe_path.is_file():
+            if not stat.S_ISREG(st.st_mode):
                 return {
                     "success": False,
                     "error": f"Path is not a file: {file_name}",
@@ -117,16 +284,37 @@ class RefactoringTools:
                     "path": str(safe_path)
                 }
 
-            with open(safe_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if st.st_size > MAX_READ_BYTES:
+                return {
+                    "success": False,
+                    "error": f"File too large to read: {file_name} ({st.st_size} bytes, "
+                             f"limit {MAX_READ_BYTES})",
+                    "content": None,
+                    "path": str(safe_path)
+                }
+
+            # Same inode, mtime and size as the last read: the content is unchanged
+            # (write_file replaces files, which gives them a new inode)
+            path_str = str(safe_path)
+            version = (st.st_ino, st.st_mtime_ns, st.st_size)
+            with self._reads_lock:
+                cached = self._reads.get(path_str)
+                if cached is not None and cached[0] == version:
+                    self._reads.move_to_end(path_str)
+            if cached is not None and cached[0] == version:
+                _, content, size_bytes = cached
+            else:
+                content, size_bytes = self._read_text(safe_path)
+                if st.st_size < MMAP_MIN_BYTES:
+                    self._cache_read(path_str, (version, content, size_bytes))
 
             return {
                 "success": True,
                 "content": content,
                 "error": None,
                 "path": str(safe_path),
-                "size_bytes": len(content.encode('utf-8')),
-                "lines": len(content.splitlines())
+                "size_bytes": size_bytes,
+                "lines": content.count("\n") + (not content.endswith("\n") and bool(content))
             }
 
         except PermissionError as e:
@@ -144,11 +332,51 @@ class RefactoringTools:
                 "path": file_name
             }
 
+    def _cache_read(self, path_str: str, entry: Tuple[Tuple[int, int, int], str, int]) -> None:
+        """Keep a read_file content, dropping the least recently read ones over the budget."""
+        with self._reads_lock:
+            previous = self._reads.pop(path_str, None)
+            if previous is not None:
+                self._reads_bytes -= previous[2]
+            self._reads[path_str] = entry
+            self._reads_bytes += entry[2]
+            while self._reads_bytes > READ_CACHE_MAX_BYTES:
+                _, evicted = self._reads.popitem(last=False)
+                self._reads_bytes -= evicted[2]
+
+    def _read_text(self, safe_path: Path) -> Tuple[str, int]:
+        """
+        Read a UTF-8 file, decoding large files directly from a memory map.
+
+        Decoding from the map avoids holding the raw bytes and the decoded
+        text in memory at the same time.
+
+        Args:
+            safe_path: Already validated path of the file
+
+        Returns:
+            Tuple (content with universal newlines, size in bytes on disk)
+        """
+        with open(safe_path, 'rb') as f:
+            size_bytes = os.fstat(f.fileno()).st_size
+            if size_bytes >= MMAP_MIN_BYTES:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    content = str(mm, 'utf-8')
+            else:
+                content = f.read().decode('utf-8')
+
+        # Same newline handling as text mode
+        if "\r" in content:
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+
+        return content, size_bytes
+
     def list_files(self, pattern: str = "*.py") -> Dict[str, Any]:
         """
         Lists all files in the sandbox matching a pattern.
 
         Helps agents discover what files are available for refactoring.
+        Listings are memoized (see _listing_stamp for when they are refreshed).
 
         Args:
             pattern: Glob pattern for file matching (default: "*.py")
@@ -159,18 +387,25 @@ class RefactoringTools:
                 - files (list): List of relative file paths
                 - count (int): Number of files found
         """
+        stamp = self._listing_stamp()
+        cached = self._listings.get(pattern)
+        if stamp is not None and cached is not None and cached[0] == stamp:
+            files = list(cached[1])
+            return {
+                "success": True,
+                "files": files,
+                "count": len(files),
+                "pattern": pattern
+            }
+
         try:
-            files = list(self.sandbox_path.glob(f"**/{pattern}"))
-            # Convert to relative paths and exclude backup directory
-            relative_files = [
-                str(f.relative_to(self.sandbox_path))
-                for f in files
-                if self.backup_dir not in f.parents and f.is_file()
-            ]
+            relative_files = sorted(self._walk_files(pattern))
+            if stamp is not None:
+                self._listings[pattern] = (stamp, tuple(relative_files))
 
             return {
                 "success": True,
-                "files": sorted(relative_files),
+                "files": relative_files,
                 "count": len(relative_files),
                 "pattern": pattern
             }
@@ -182,6 +417,62 @@ class RefactoringTools:
                 "count": 0
             }
 
+    def _walk_files(self, pattern: str) -> List[str]:
+        """
+        Walk the sandbox with os.scandir and return the matching relative paths.
+
+        The backup directory is pruned instead of being listed and filtered,
+        and names are matched before any Path is built.
+        """
+        # "**/" is implied: every directory is walked, and fnmatch's "*" crosses "/"
+        while pattern.startswith("**/"):
+            pattern = pattern[3:]
+        root = self._sandbox_str
+        backup_dir = str(self.backup_dir)
+        match_path = "/" in pattern
+        relative_files = []
+        pending = [root]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.path != backup_dir:
+                            pending.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    if match_path:
+                        relative = os.path.relpath(entry.path, root).replace(os.sep, "/")
+                        if not (fnmatch.fnmatchcase(relative, pattern)
+                                or fnmatch.fnmatchcase(relative, f"*/{pattern}")):
+                            continue
+                    elif not fnmatch.fnmatchcase(entry.name, pattern):
+                        continue
+                    relative_files.append(os.path.relpath(entry.path, root))
+        return relative_files
+
+    def _listing_stamp(self) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Validity stamp of the memoized listings.
+
+        Changes when a file is created, renamed or deleted at the sandbox root
+        or in the backup directory, when a file is written through this
+        instance, and at least every LISTING_TTL seconds (for changes made
+        deeper in the tree by other processes).
+
+        Returns:
+            The stamp, or None if the sandbox cannot be stat'ed (no memoization)
+        """
+        try:
+            return (
+                os.stat(self._sandbox_str).st_mtime_ns,
+                os.stat(self.backup_dir).st_mtime_ns,
+                self._write_version,
+                int(time.monotonic() // LISTING_TTL),
+            )
+        except OSError:
+            return None
+
     def run_pylint(self, file_name: str) -> Dict[str, Any]:
         """
         Runs pylint static analysis on a file.
@@ -201,97 +492,208 @@ class RefactoringTools:
                 - conventions (list): List of convention violations
                 - file_path (str): Path that was analyzed
         """
-        try:
-            safe_path = self._safe_path(file_name)
+        # One pylint process (JSON report, score computed from it) instead of
+        # one JSON run plus one text run for the score
+        batch = self.run_pylint_batch([file_name])
 
-            if not safe_path.exists():
+        if not batch["success"]:
+            error = batch.get("error", "")
+            if error.startswith("File not found"):
                 return {
                     "success": False,
-                    "error": f"File not found: {file_name}",
+                    "error": error,
                     "score": None,
                     "raw_output": None
                 }
+            return {
+                "success": False,
+                "error": error,
+                "score": None
+            }
 
-            # Run pylint with JSON output format for better parsing
-            result = subprocess.run(
-                ['pylint', str(safe_path), '--output-format=json'],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+        return batch["results"][file_name]
 
-            # Parse JSON output
-            try:
-                issues = json.loads(result.stdout) if result.stdout else []
-            except json.JSONDecodeError:
-                issues = []
-
-            # Run again with text format to get the score
-            result_text = subprocess.run(
-                ['pylint', str(safe_path), '--output-format=text'],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+    def run_pylint_batch(self, file_names: List[str]) -> Dict[str, Any]:
+        """
+        Runs pylint once on several files and splits the report per file.
 
-            # Extract score from text output
-            score = self._extract_pylint_score(result_text.stdout)
+        Interpreter start-up and astroid bootstrap dominate pylint's cost on
+        small files, so one process for N files is much cheaper than N calls
+        to run_pylint(). Reports are cached on disk by pylint version, path and
+        file bytes, plus the pylint configuration and the sandbox's sources
+        (import and inference messages depend on the other modules), so
+        unchanged files are not analyzed again.
 
-            # Categorize issues
-            errors = [i for i in issues if i.get('type') == 'error']
-            warnings = [i for i in issues if i.get('type') == 'warning']
-            conventions = [i for i in issues if i.get('type') == 'convention']
-            refactors = [i for i in issues if i.get('type') == 'refactor']
+        Args:
+            file_names: Paths of the Python files to analyze
 
-            return {
-                "success": True,
-                "score": score,
-                "raw_output": result_text.stdout,
-                "errors": errors,
-                "warnings": warnings,
-                "conventions": conventions,
-                "refactors": refactors,
-                "total_issues": len(issues),
-                "file_path": str(safe_path),
-                "summary": self._generate_pylint_summary(score, errors, warnings, conventions, refactors)
+        Returns:
+            Dictionary with:
+                - success (bool): Whether pylint ran successfully
+                - results (dict): file_name -> result shaped like run_pylint()
+                - error (str): Error message if failed
+        """
+        try:
+            safe_paths = {name: self._safe_path(name) for name in file_names}
+
+            for name, safe_path in safe_paths.items():
+                if not safe_path.exists():
+                    return {
+                        "success": False,
+                        "error": f"File not found: {name}",
+                        "results": {}
+                    }
+
+            if not safe_paths:
+                return {"success": True, "results": {}, "error": None}
+
+            # Reports cached by pylint version, configuration, project sources, path
+            # and file bytes: only new or modified files go through pylint
+            cache = get_cache()
+            version = pylint_version()
+            context = self._pylint_context_digest()
+            keys = {
+                name: make_key("pylint", PYLINT_REPORT_FORMAT, version, context, str(safe_path),
+                               hashlib.blake2b(safe_path.read_bytes(), digest_size=16).hexdigest())
+                for name, safe_path in safe_paths.items()
             }
+            results = {}
+            for name in safe_paths:
+                report = cache.get("pylint", keys[name])
+                if report is not None:
+                    results[name] = report
+            safe_paths = {name: path for name, path in safe_paths.items() if name not in results}
+            if not safe_paths:
+                return {"success": True, "results": results, "error": None}
+
+            timeout = 30 * len(safe_paths)
+            paths = [str(p) for p in safe_paths.values()]
+            reports = _pylint_in_process(paths)
+            if reports is None:
+                # Same per-file reports, from the runner script in a subprocess
+                result = subprocess.run(
+                    [sys.executable, pylint_runner.__file__, *paths],
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout
+                )
+                if result.returncode == pylint_runner.EXIT_NOT_INSTALLED:
+                    raise FileNotFoundError("pylint")
+                try:
+                    reports = orjson.loads(result.stdout)
+                except orjson.JSONDecodeError:
+                    return {
+                        "success": False,
+                        "error": f"Pylint produced no report: {result.stderr[-500:]}",
+                        "results": {}
+                    }
+
+            for name, safe_path in safe_paths.items():
+                report = reports.get(str(safe_path))
+                if report is None:
+                    # Not analyzed at all (pylint could not load it): no score, and
+                    # nothing cached so the next call analyzes it again
+                    results[name] = {
+                        "success": False,
+                        "error": f"Pylint produced no report for {name}",
+                        "score": None
+                    }
+                    continue
+                results[name] = self._build_pylint_result(
+                    safe_path, report["messages"], report["score"], report["raw_output"])
+                cache.set("pylint", keys[name], results[name])
+
+            return {"success": True, "results": results, "error": None}
 
         except subprocess.TimeoutExpired:
             return {
                 "success": False,
-                "error": "Pylint analysis timed out (30s limit)",
-                "score": None
+                "error": f"Pylint analysis timed out ({timeout}s limit)",
+                "results": {}
             }
         except FileNotFoundError:
             return {
                 "success": False,
                 "error": "Pylint is not installed. Run: pip install pylint",
-                "score": None
+                "results": {}
             }
         except PermissionError as e:
             return {
                 "success": False,
                 "error": str(e),
-                "score": None
+                "results": {}
             }
         except Exception as e:
             return {
                 "success": False,
                 "error": f"Unexpected error running pylint: {str(e)}",
-                "score": None
+                "results": {}
             }
 
-    def _extract_pylint_score(self, output: str) -> Optional[float]:
-        """Extract the numeric score from pylint text output."""
-        for line in output.splitlines():
-            if "Your code has been rated at" in line:
-                # Example: "Your code has been rated at 7.50/10"
-                try:
-                    score_str = line.split("rated at")[1].split("/")[0].strip()
-                    return float(score_str)
-                except (IndexError, ValueError):
-                    pass
-        return None
+    def _pylint_context_digest(self) -> str:
+        """
+        Digest of what a file's pylint report depends on besides the file itself.
+
+        Covers the configuration files pylint may read (current directory,
+        sandbox, PYLINTRC and the user's pylintrc) by contents, and every
+        Python file of the sandbox by path, size and modification time.
+
+        Returns:
+            Hex digest, part of the pylint report cache key
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        config_paths = [
+            os.path.join(directory, name)
+            for directory in (os.getcwd(), self._sandbox_str)
+            for name in PYLINT_CONFIG_FILES
+        ]
+        config_paths += [
+            os.environ.get("PYLINTRC", ""),
+            os.path.expanduser(os.path.join("~", ".pylintrc")),
+            os.path.expanduser(os.path.join("~", ".config", "pylintrc")),
+        ]
+        for config_path in config_paths:
+            try:
+                with open(config_path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            digest.update(f"{config_path}\0{len(data)}\0".encode())
+            digest.update(data)
+        for relative in sorted(self._walk_files("*.py")):
+            try:
+                st = os.stat(os.path.join(self._sandbox_str, relative))
+            except OSError:
+                continue
+            digest.update(f"{relative}\0{st.st_size}\0{st.st_mtime_ns}\0".encode())
+        return digest.hexdigest()
+
+    def _build_pylint_result(self, safe_path: Path, issues: list,
+                             score: Optional[float], raw_output: str) -> Dict[str, Any]:
+        """Categorize pylint messages into the result shape used by the agents."""
+        # One pass over the messages instead of one per category
+        by_type = {'error': [], 'warning': [], 'convention': [], 'refactor': []}
+        for issue in issues:
+            bucket = by_type.get(issue.get('type'))
+            if bucket is not None:
+                bucket.append(issue)
+        errors = by_type['error']
+        warnings = by_type['warning']
+        conventions = by_type['convention']
+        refactors = by_type['refactor']
+
+        return {
+            "success": True,
+            "score": score,
+            "raw_output": raw_output,
+            "errors": errors,
+            "warnings": warnings,
+            "conventions": conventions,
+            "refactors": refactors,
+            "total_issues": len(issues),
+            "file_path": str(safe_path),
+            "summary": self._generate_pylint_summary(score, errors, warnings, conventions, refactors)
+        }
 
     def _generate_pylint_summary(self, score: Optional[float], errors: list,
                                  warnings: list, conventions: list, refactors: list) -> str:
@@ -339,25 +741,38 @@ class RefactoringTools:
 
             backup_path = None
 
-            # Create backup if file exists and backup is requested
-            if create_backup and safe_path.exists():
-                backup_result = self.create_backup(file_name)
-                if backup_result["success"]:
-                    backup_path = backup_result["backup_path"]
-
             # Ensure parent directory exists
             safe_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Write the content
-            with open(safe_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Encode once, write to a sibling temp file and swap it in: readers never see
+            # a partial file, and a hard-linked backup keeps the previous content
+            data = content.encode('utf-8')
+            tmp_path = self._temp_sibling(safe_path)
+            try:
+                tmp_path.write_bytes(data)
+                try:
+                    old_mode = stat.S_IMODE(os.stat(safe_path).st_mode)
+                except FileNotFoundError:
+                    old_mode = None
+                if old_mode is not None:
+                    # The replacement keeps the permissions of the file it replaces
+                    # (the temp file was created with the umask defaults)
+                    os.chmod(tmp_path, old_mode)
+                    # Create backup if backup is requested (hard link when possible)
+                    if create_backup:
+                        backup_path = self._backup_before_replace(safe_path)
+                os.replace(tmp_path, safe_path)
+                self._write_version += 1
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
 
             return {
                 "success": True,
                 "path": str(safe_path),
                 "backup_path": backup_path,
-                "bytes_written": len(content.encode('utf-8')),
-                "lines_written": len(content.splitlines()),
+                "bytes_written": len(data),
+                "lines_written": content.count("\n") + (not content.endswith("\n") and bool(content)),
                 "error": None
             }
 
@@ -374,10 +789,90 @@ class RefactoringTools:
                 "path": file_name
             }
 
+    @staticmethod
+    def _temp_sibling(path: Path) -> Path:
+        """
+        Temporary path next to `path` (same directory, so os.replace stays atomic).
+
+        The name is unique per process and thread, since the Fixer writes in parallel.
+        """
+        return path.with_name(f".{path.name}.tmp.{os.getpid()}.{threading.get_ident()}")
+
+    def _backup_name(self, safe_path: Path, attempt: int = 0) -> Tuple[Path, str]:
+        """
+        Timestamp-based backup path for a file, and the timestamp used.
+
+        The timestamp has microseconds; a non-zero `attempt` adds a counter,
+        for a name already taken.
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        if attempt:
+            timestamp = f"{timestamp}_{attempt}"
+        backup_name = f"{safe_path.stem}_{timestamp}{safe_path.suffix}"
+        return self.backup_dir / backup_name, timestamp
+
+    def _link_backup(self, safe_path: Path) -> Tuple[Path, str]:
+        """
+        Back up a file under a new name in the backup directory.
+
+        The backup is a hard link to the file, or a copy where links are not
+        possible (see LINK_UNSUPPORTED_ERRNOS). An existing backup is never
+        overwritten: a name already taken is retried with a counter.
+
+        Args:
+            safe_path: Already validated path of the file
+
+        Returns:
+            Tuple (backup path, timestamp)
+
+        Raises:
+            OSError: If the backup cannot be created
+        """
+        attempt = 0
+        while True:
+            backup_path, timestamp = self._backup_name(safe_path, attempt)
+            attempt += 1
+            try:
+                os.link(safe_path, backup_path)
+            except FileExistsError:
+                continue
+            except OSError as e:
+                if e.errno not in LINK_UNSUPPORTED_ERRNOS:
+                    raise
+                try:
+                    with open(safe_path, "rb") as src, open(backup_path, "xb") as dst:
+                        shutil.copyfileobj(src, dst)
+                except FileExistsError:
+                    continue
+                shutil.copystat(safe_path, backup_path)
+            return backup_path, timestamp
+
+    def _backup_before_replace(self, safe_path: Path) -> Optional[str]:
+        """
+        Back up a file that write_file is about to replace (see _link_backup).
+
+        Args:
+            safe_path: Already validated path of the file
+
+        Returns:
+            Path of the backup, or None if it could not be created
+        """
+        try:
+            backup_path, _ = self._link_backup(safe_path)
+        except OSError:
+            return None
+        return str(backup_path)
+
     def create_backup(self, file_name: str) -> Dict[str, Any]:
         """
         Creates a timestamped backup of a file.
 
+        The backup is usually a hard link sharing the file's inode, so it only
+        keeps this version if the file is later replaced, not rewritten in
+        place: every write to sandbox files must go through write_file or
+        restore_backup (file_operations.write_file for the agents), never
+        open(..., "w") or Path.write_text.
+
         Args:
             file_name: Path to the file to backup
 
@@ -397,13 +892,9 @@ class RefactoringTools:
                     "backup_path": None
                 }
 
-            # Create timestamp-based backup name
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_name = f"{safe_path.stem}_{timestamp}{safe_path.suffix}"
-            backup_path = self.backup_dir / backup_name
-
-            # Copy the file
-            shutil.copy2(safe_path, backup_path)
+            # Hard link instead of a copy: write_file and restore_backup replace the
+            # file rather than rewrite it, so the linked inode keeps this version
+            backup_path, timestamp = self._link_backup(safe_path)
 
             return {
                 "success": True,
@@ -449,8 +940,17 @@ class RefactoringTools:
             # Validate target path is in sandbox
             target_path = self._safe_path(target_file)
 
-            # Restore the backup
-            shutil.copy2(backup_full, target_path)
+            # Restore the backup (replace, never rewrite in place: the backup may be
+            # hard-linked to the target's previous version)
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._temp_sibling(target_path)
+            try:
+                shutil.copy2(backup_full, tmp_path)
+                os.replace(tmp_path, target_path)
+                self._write_version += 1
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
 
             return {
                 "success": True,
@@ -469,23 +969,46 @@ class RefactoringTools:
         """
         Lists all available backups.
 
+        Memoized like list_files (see _listing_stamp): a new backup changes
+        the backup directory's mtime, which refreshes the list.
+
         Returns:
             Dictionary with list of backups and their details
         """
+        stamp = self._listing_stamp()
+        cached = self._listings.get(":backups")
+        if stamp is not None and cached is not None and cached[0] == stamp:
+            backups = [dict(backup) for backup in cached[1]]
+            return {
+                "success": True,
+                "backups": backups,
+                "count": len(backups)
+            }
+
         try:
-            backups = []
-            for backup_file in self.backup_dir.glob("*"):
-                if backup_file.is_file():
-                    backups.append({
-                        "name": backup_file.name,
-                        "path": str(backup_file),
-                        "size_bytes": backup_file.stat().st_size,
-                        "modified": datetime.fromtimestamp(backup_file.stat().st_mtime).isoformat()
-                    })
+            # One stat per entry, sorted on the numeric mtime (newest first)
+            entries = []
+            with os.scandir(self.backup_dir) as it:
+                for entry in it:
+                    if entry.is_file(follow_symlinks=False):
+                        entries.append((entry.stat(follow_symlinks=False), entry))
+            entries.sort(key=lambda item: item[0].st_mtime_ns, reverse=True)
+
+            backups = [
+                {
+                    "name": entry.name,
+                    "path": entry.path,
+                    "size_bytes": st.st_size,
+                    "modified": datetime.fromtimestamp(st.st_mtime).isoformat()
+                }
+                for st, entry in entries
+            ]
+            if stamp is not None:
+                self._listings[":backups"] = (stamp, tuple(dict(backup) for backup in backups))
 
             return {
                 "success": True,
-                "backups": sorted(backups, key=lambda x: x["modified"], reverse=True),
+                "backups": backups,
                 "count": len(backups)
             }
         except Exception as e:
@@ -497,15 +1020,21 @@ class RefactoringTools:
 
     # ==================== JUDGE TOOLS (Validation) ====================
 
-    def run_pytest(self, target: Optional[str] = None, verbose: bool = True) -> Dict[str, Any]:
+    def run_pytest(self, target: Optional[str] = None, verbose: bool = True,
+                   targets: Optional[List[str]] = None,
+                   max_failures: Optional[int] = None) -> Dict[str, Any]:
         """
         Runs pytest on the sandbox or a specific file/directory.
 
         This is the Judge's tool for verifying that refactored code still works.
+        Sessions run in a child of the resident pytest worker when possible
+        (see pytest_worker; PYTEST_WORKER=0 disables it), else in a subprocess.
 
         Args:
             target: Specific file or directory to test (None = entire sandbox)
             verbose: Whether to run pytest in verbose mode
+            targets: Several test files to run in a single pytest session (overrides target)
+            max_failures: Stop the session after this many failures (pytest --maxfail)
 
         Returns:
             Dictionary with:
@@ -515,12 +1044,24 @@ class RefactoringTools:
                 - errors (int): Number of errors
                 - stdout (str): Standard output from pytest
                 - stderr (str): Standard error from pytest
+                - has_assertion_error (bool): Whether an AssertionError was reported
+                - has_syntax_error (bool): Whether a SyntaxError was reported
                 - detailed_failures (list): Detailed failure information
         """
         try:
             # Determine what to test
-            if target is None:
-                test_path = self.sandbox_path
+            if targets:
+                test_paths = [self._safe_path(t) for t in targets]
+                missing = [t for t, path in zip(targets, test_paths) if not path.exists()]
+                if missing:
+                    return {
+                        "success": False,
+                        "error": f"Test target not found: {', '.join(missing)}",
+                        "passed": 0,
+                        "failed": 0
+                    }
+            elif target is None:
+                test_paths = [self.sandbox_path]
             else:
                 test_path = self._safe_path(target)
                 if not test_path.exists():
@@ -530,44 +1071,66 @@ class RefactoringTools:
                         "passed": 0,
                         "failed": 0
                     }
+                test_paths = [test_path]
 
             # Build pytest command
-            cmd = ['pytest', str(test_path)]
+            cmd = ['pytest', *(str(path) for path in test_paths)]
             if verbose:
                 cmd.append('-v')
             cmd.extend(['--tb=short', '--no-header'])  # Better output format
-
-            # Run pytest
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60,
-                cwd=str(self.sandbox_path)
-            )
+            # No .pytest_cache to read and rewrite on each run: the Judge tracks
+            # failing tests itself (no --lf/--ff)
+            cmd.extend(['-p', 'no:cacheprovider'])
+            if max_failures:
+                cmd.append(f'--maxfail={max_failures}')
+            test_file_count = self._count_test_files(test_paths)
+            cmd.extend(self._xdist_args(test_file_count))
+
+            # Run pytest (time budget grows with the number of test files)
+            timeout = PYTEST_BASE_TIMEOUT + PYTEST_TIMEOUT_PER_FILE * test_file_count
+            # Resident worker first (pytest and plugins already imported), else a subprocess
+            session = None
+            if not _env_disabled("PYTEST_WORKER"):
+                session = get_pytest_worker().run(cmd[1:], str(self.sandbox_path), timeout)
+            if session is None:
+                # Outputs go to files, not pipes: a verbose run is not buffered
+                # whole in memory, only read back within read_output's bound
+                with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+                    result = subprocess.run(
+                        cmd,
+                        stdout=out,
+                        stderr=err,
+                        timeout=timeout,
+                        cwd=str(self.sandbox_path)
+                    )
+                    session = (result.returncode, read_output(out), read_output(err))
+            return_code, stdout, stderr = session
 
             # Parse the output to extract test statistics
-            stats = self._parse_pytest_output(result.stdout + result.stderr)
+            stats = self._parse_pytest_output(stdout + stderr)
 
             return {
-                "success": result.returncode == 0,
+                "success": return_code == 0,
                 "passed": stats["passed"],
                 "failed": stats["failed"],
                 "errors": stats["errors"],
                 "skipped": stats["skipped"],
                 "total": stats["total"],
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "full_output": result.stdout + "\n" + result.stderr,
-                "return_code": result.returncode,
-                "test_path": str(test_path),
-                "summary": self._generate_pytest_summary(stats, result.returncode)
+                "stdout": stdout,
+                "stderr": stderr,
+                "full_output": stdout + "\n" + stderr,
+                # Error kinds seen in the output: callers need not scan it again
+                "has_assertion_error": "AssertionError" in stdout or "AssertionError" in stderr,
+                "has_syntax_error": "SyntaxError" in stdout or "SyntaxError" in stderr,
+                "return_code": return_code,
+                "test_path": " ".join(str(path) for path in test_paths),
+                "summary": self._generate_pytest_summary(stats, return_code)
             }
 
         except subprocess.TimeoutExpired:
             return {
                 "success": False,
-                "error": "Pytest execution timed out (60s limit)",
+                "error": f"Pytest execution timed out ({timeout}s limit)",
                 "passed": 0,
                 "failed": 0
             }
@@ -593,6 +1156,54 @@ class RefactoringTools:
                 "failed": 0
             }
 
+    def _count_test_files(self, test_paths: List[Path]) -> int:
+        """
+        Number of test files a pytest session will run (sizes its timeout and workers).
+
+        Args:
+            test_paths: Files or directories passed to pytest
+
+        Returns:
+            Number of test files
+        """
+        test_files = self.list_files("test_*.py")["files"]
+        count = 0
+        for path in test_paths:
+            if not path.is_dir():
+                count += 1
+                continue
+            relative = os.path.relpath(path, self._sandbox_str)
+            if relative == os.curdir:
+                count += len(test_files)
+            else:
+                prefix = os.path.join(relative, "")
+                count += sum(1 for f in test_files if f.startswith(prefix))
+        return count
+
+    def _xdist_args(self, test_file_count: int) -> List[str]:
+        """
+        Build the pytest-xdist arguments used to spread tests over the CPU cores.
+
+        Two cores are left free for the agents. Tests of the same file stay on
+        the same worker (--dist=loadfile) so module-level fixtures run once;
+        hence no more workers than test files, and no xdist at all for a
+        single file (starting workers would only add overhead).
+        Set PYTEST_XDIST=0 (environment or .env) to run tests in a single
+        process, e.g. to debug a failing test.
+
+        Args:
+            test_file_count: Number of test files in the session
+
+        Returns:
+            Extra pytest arguments (empty if disabled, xdist is missing or only one worker fits)
+        """
+        if _env_disabled("PYTEST_XDIST"):
+            return []
+        workers = min((os.cpu_count() or 1) - 2, test_file_count)
+        if workers < 2 or not _xdist_available():
+            return []
+        return ['-n', str(workers), '--dist=loadfile']
+
     def _parse_pytest_output(self, output: str) -> Dict[str, int]:
         """Parse pytest output to extract test statistics."""
         stats = {
@@ -603,34 +1214,13 @@ class RefactoringTools:
             "total": 0
         }
 
-        # Look for pytest summary line
-        # Example: "= 3 passed, 1 failed in 0.12s ="
-        for line in output.splitlines():
-            if " passed" in line or " failed" in line:
-                if "passed" in line:
-                    try:
-                        stats["passed"] = int(line.split()[1])
-                    except (IndexError, ValueError):
-                        pass
-                if "failed" in line:
-                    try:
-                        # Find the word before "failed"
-                        words = line.split()
-                        for i, word in enumerate(words):
-                            if word == "failed" and i > 0:
-                                stats["failed"] = int(words[i-1])
-                                break
-                    except (IndexError, ValueError):
-                        pass
-                if "error" in line:
-                    try:
-                        words = line.split()
-                        for i, word in enumerate(words):
-                            if "error" in word and i > 0:
-                                stats["errors"] = int(words[i-1])
-                                break
-                    except (IndexError, ValueError):
-                        pass
+        # The summary line is always last, e.g. "= 1 failed, 3 passed in 0.12s =":
+        # only the tail of the output is searched
+        summaries = _PYTEST_SUMMARY_RE.findall(output[-PYTEST_SUMMARY_TAIL:])
+        if summaries:
+            for count, outcome in _PYTEST_COUNT_RE.findall(summaries[-1]):
+                key = "errors" if outcome.startswith("error") else outcome
+                stats[key] = int(count)
 
         stats["total"] = stats["passed"] + stats["failed"] + stats["errors"]
         return stats
@@ -663,22 +1253,35 @@ class RefactoringTools:
         """
         Returns information about the sandbox environment.
 
+        Memoized like list_files (see _listing_stamp).
+
         Returns:
             Dictionary with sandbox details
         """
+        stamp = self._listing_stamp()
+        cached = self._listings.get(":info")
+        if stamp is not None and cached is not None and cached[0] == stamp:
+            return dict(cached[1])
+
         try:
-            python_files = list(self.sandbox_path.glob("**/*.py"))
+            python_files = self.list_files("*.py")["files"]
             test_files = [
-                f for f in python_files if "test_" in f.name or f.name.endswith("_test.py")]
+                f for f in python_files
+                if "test_" in os.path.basename(f) or f.endswith("_test.py")]
+            with os.scandir(self.backup_dir) as entries:
+                backups = sum(1 for _ in entries)
 
-            return {
+            info = {
                 "sandbox_path": str(self.sandbox_path),
                 "backup_path": str(self.backup_dir),
                 "total_python_files": len(python_files),
                 "test_files": len(test_files),
-                "backups_available": len(list(self.backup_dir.glob("*"))),
+                "backups_available": backups,
                 "exists": self.sandbox_path.exists()
             }
+            if stamp is not None:
+                self._listings[":info"] = (stamp, info)
+            return dict(info)
         except Exception as e:
             return {
                 "error": f"Error getting sandbox info: {str(e)}"
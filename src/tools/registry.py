@@ -0,0 +1,45 @@
+"""
+Tool Registry - Shared RefactoringTools instance for the tool modules
+
+The orchestrator registers its own instance (configured with its sandbox) so
+file_operations and analysis_tools work on the same sandbox and share a
+single RefactoringTools object.
+"""
+
+import threading
+from typing import Optional
+
+from src.tools.refactoring_tools import RefactoringTools
+
+
+# Default sandbox when nothing has been registered (scripts, direct tool use)
+DEFAULT_SANDBOX = "./sandbox"
+
+_tools: Optional[RefactoringTools] = None
+_lock = threading.Lock()
+
+
+def set_tools(tools: RefactoringTools) -> None:
+    """
+    Register the RefactoringTools instance used by the tool modules.
+
+    Args:
+        tools: Instance configured with the sandbox to work on
+    """
+    global _tools
+    with _lock:
+        _tools = tools
+
+
+def get_tools() -> RefactoringTools:
+    """
+    Get the registered tools instance (created on the default sandbox if none).
+
+    Returns:
+        Shared RefactoringTools instance
+    """
+    global _tools
+    with _lock:
+        if _tools is None:
+            _tools = RefactoringTools(base_sandbox=DEFAULT_SANDBOX)
+        return _tools
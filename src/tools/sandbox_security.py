@@ -4,10 +4,18 @@ Sandbox Security - Validates file paths to prevent escaping the sandbox
 Ensures all file operations stay within the authorized sandbox directory.
 """
 
+import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Union
 
 
+@lru_cache(maxsize=8)
+def _sandbox_root(cwd: str) -> str:
+    """Resolved sandbox directory for a working directory (resolved once per cwd)."""
+    return os.path.realpath(os.path.join(cwd, "sandbox"))
+
+
 def validate_path(file_path: Union[str, Path]) -> Path:
     """
     Validate that a file path is within the sandbox.
@@ -21,19 +29,14 @@ def validate_path(file_path: Union[str, Path]) -> Path:
     Raises:
         PermissionError: If path is outside the sandbox
     """
-    sandbox_path = Path("./sandbox").resolve()
-
-    # Convert to Path and resolve
-    if isinstance(file_path, str):
-        file_path = Path(file_path)
+    sandbox_path = _sandbox_root(os.getcwd())
 
-    full_path = file_path.resolve() if file_path.is_absolute() else (
-        sandbox_path / file_path).resolve()
+    # An absolute path is kept as is by join. The target is still fully
+    # resolved: a symlink inside the sandbox may point outside of it
+    full_path = os.path.realpath(os.path.join(sandbox_path, file_path))
 
     # Check if the path is within sandbox
-    try:
-        full_path.relative_to(sandbox_path)
-    except ValueError:
+    if full_path != sandbox_path and not full_path.startswith(os.path.join(sandbox_path, "")):
         raise PermissionError(
             f"🚫 SECURITY VIOLATION: Access denied to '{file_path}'\n"
             f"   Reason: Path is outside the sandbox boundary.\n"
@@ -41,4 +44,4 @@ def validate_path(file_path: Union[str, Path]) -> Path:
             f"   Attempted: {full_path}"
         )
 
-    return full_path
+    return Path(full_path)
@@ -5,11 +5,30 @@ This wrapper automatically logs all tool interactions for scientific analysis
 and provides a cleaner interface for the agents.
 """
 
-from typing import Dict, Optional, Any
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import orjson
+
 from src.tools.refactoring_tools import RefactoringTools
 from src.utils.logger import log_experiment, ActionType
 
 
+# Logged pytest outputs keep only their end (failures summary and counts)
+LOG_OUTPUT_TAIL = 4096
+_PYTEST_OUTPUT_KEYS = ("stdout", "stderr", "full_output")
+
+# validate_target_dir results are reused for this long (seconds)
+VALIDATE_TTL = 1.0
+
+
+def _to_json(data: Any) -> str:
+    """JSON text of a tool input or output (non-JSON values such as paths as str)."""
+    return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 class ToolWrapper:
     """
     High-level wrapper around RefactoringTools that adds automatic logging.
@@ -28,24 +47,35 @@ class ToolWrapper:
         """
         self.tools = RefactoringTools(base_sandbox)
         self.enable_logging = enable_logging
+        # validate_target_dir results: target_dir -> (monotonic time, result)
+        self._validations: Dict[str, Tuple[float, Dict[str, Any]]] = {}
 
     def _log_tool_call(self, agent_name: str, model_used: str, action: ActionType,
-                       tool_name: str, input_data: Dict, output_data: Dict):
-        """Helper to log tool interactions."""
+                       tool_name: str, input_data_factory: Callable[[], Dict],
+                       output_data: Dict, success: Optional[bool] = None):
+        """
+        Helper to log tool interactions.
+
+        The input dict is built by input_data_factory only when logging is
+        enabled, so disabled telemetry costs no allocation per call. success
+        overrides output_data["success"] when the caller already read it.
+        """
         if not self.enable_logging:
             return
 
         try:
+            input_data = input_data_factory()
+            # Input and output are recorded once, as the JSON text log_experiment
+            # requires (no second copy as nested dicts)
             details = {
-                "input_prompt": f"Tool: {tool_name}\nInput: {str(input_data)}",
-                "output_response": str(output_data),
-                "tool_name": tool_name,
-                "input": input_data,
-                "output": output_data
+                "input_prompt": f"Tool: {tool_name}\nInput: {_to_json(input_data)}",
+                "output_response": _to_json(output_data),
+                "tool_name": tool_name
             }
 
-            status = "SUCCESS" if output_data.get(
-                "success", False) else "FAILURE"
+            if success is None:
+                success = output_data.get("success", False)
+            status = "SUCCESS" if success else "FAILURE"
 
             log_experiment(
                 agent_name=agent_name,
@@ -58,6 +88,21 @@ class ToolWrapper:
             # Don't let logging errors break the tool execution
             print(f"⚠️ Warning: Failed to log tool call: {e}")
 
+    @staticmethod
+    def _compact_pytest_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy of a run_pytest result whose outputs are cut to their last characters.
+
+        The log entry keeps the counts and error flags; the full output stays
+        in the result returned to the caller.
+        """
+        compact = dict(result)
+        for key in _PYTEST_OUTPUT_KEYS:
+            output = compact.get(key)
+            if isinstance(output, str) and len(output) > LOG_OUTPUT_TAIL:
+                compact[key] = output[-LOG_OUTPUT_TAIL:]
+        return compact
+
     # ==================== AUDITOR TOOLS ====================
 
     def audit_read_file(self, file_name: str, agent_name: str = "Auditor",
@@ -80,7 +125,7 @@ class ToolWrapper:
             model_used=model_used,
             action=ActionType.ANALYSIS,
             tool_name="read_file",
-            input_data={"file_name": file_name},
+            input_data_factory=lambda: {"file_name": file_name},
             output_data=result
         )
 
@@ -106,12 +151,93 @@ class ToolWrapper:
             model_used=model_used,
             action=ActionType.ANALYSIS,
             tool_name="run_pylint",
-            input_data={"file_name": file_name},
+            input_data_factory=lambda: {"file_name": file_name},
             output_data=result
         )
 
         return result
 
+    def audit_run_pylint_batch(self, file_names: List[str], agent_name: str = "Auditor",
+                               model_used: str = "unknown") -> Dict[str, Any]:
+        """
+        Run pylint once on several files, with one log entry per file.
+
+        Args:
+            file_names: Paths to the files to analyze
+            agent_name: Name of the agent calling this tool
+            model_used: Model being used by the agent
+
+        Returns:
+            Result dictionary from run_pylint_batch
+        """
+        result = self.tools.run_pylint_batch(file_names)
+        self._log_pylint_batch(file_names, result, agent_name, model_used)
+        return result
+
+    def audit_run_pylint_many(self, file_names: List[str], max_workers: Optional[int] = None,
+                              agent_name: str = "Auditor",
+                              model_used: str = "unknown") -> Dict[str, Any]:
+        """
+        Run pylint on many files with several pylint runs in parallel.
+
+        The files are split into one batch per worker. Each batch is one
+        run_pylint_batch call, so batches analyzed concurrently run in
+        separate pylint processes.
+
+        Args:
+            file_names: Paths to the files to analyze
+            max_workers: Number of concurrent batches (default: CPU count)
+            agent_name: Name of the agent calling this tool
+            model_used: Model being used by the agent
+
+        Returns:
+            Result dictionary shaped like run_pylint_batch's (the first
+            failing batch's result if any batch failed)
+        """
+        workers = max(1, min(len(file_names), max_workers or os.cpu_count() or 1))
+        chunks = [file_names[i::workers] for i in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            chunk_results = list(executor.map(self.tools.run_pylint_batch, chunks))
+
+        result = next((r for r in chunk_results if not r["success"]), None)
+        if result is None:
+            merged = {}
+            for chunk_result in chunk_results:
+                merged.update(chunk_result["results"])
+            # Same order as file_names, whatever batch analyzed each file
+            results = {name: merged[name] for name in file_names if name in merged}
+            result = {"success": True, "results": results, "error": None}
+
+        self._log_pylint_batch(file_names, result, agent_name, model_used)
+        return result
+
+    def _log_pylint_batch(self, file_names: List[str], result: Dict[str, Any],
+                          agent_name: str, model_used: str) -> None:
+        """Log a batch failure once, or one run_pylint entry per analyzed file."""
+        if not self.enable_logging:
+            return
+
+        if not result["success"]:
+            self._log_tool_call(
+                agent_name=agent_name,
+                model_used=model_used,
+                action=ActionType.ANALYSIS,
+                tool_name="run_pylint_batch",
+                input_data_factory=lambda: {"file_names": file_names},
+                output_data=result
+            )
+            return
+
+        for file_name, file_result in result["results"].items():
+            self._log_tool_call(
+                agent_name=agent_name,
+                model_used=model_used,
+                action=ActionType.ANALYSIS,
+                tool_name="run_pylint",
+                input_data_factory=lambda: {"file_name": file_name},
+                output_data=file_result
+            )
+
     def audit_list_files(self, pattern: str = "*.py", agent_name: str = "Auditor",
                          model_used: str = "unknown") -> Dict[str, Any]:
         """
@@ -132,7 +258,7 @@ class ToolWrapper:
             model_used=model_used,
             action=ActionType.ANALYSIS,
             tool_name="list_files",
-            input_data={"pattern": pattern},
+            input_data_factory=lambda: {"pattern": pattern},
             output_data=result
         )
 
@@ -162,7 +288,7 @@ class ToolWrapper:
             model_used=model_used,
             action=ActionType.FIX,
             tool_name="write_file",
-            input_data={
+            input_data_factory=lambda: {
                 "file_name": file_name,
                 "content_length": len(content),
                 "create_backup": create_backup
@@ -193,8 +319,8 @@ class ToolWrapper:
             model_used=model_used,
             action=ActionType.FIX,
             tool_name="restore_backup",
-            input_data={"backup_path": backup_path,
-                        "target_file": target_file},
+            input_data_factory=lambda: {"backup_path": backup_path,
+                                        "target_file": target_file},
             output_data=result
         )
 
@@ -218,14 +344,19 @@ class ToolWrapper:
         """
         result = self.tools.run_pytest(target, verbose)
 
+        # Checked here too: the compact copy of the result is only built for the log
+        if not self.enable_logging:
+            return result
+
+        success = bool(result.get("success", False))
         self._log_tool_call(
             agent_name=agent_name,
             model_used=model_used,
-            action=ActionType.DEBUG if not result.get(
-                "success") else ActionType.ANALYSIS,
+            action=ActionType.ANALYSIS if success else ActionType.DEBUG,
             tool_name="run_pytest",
-            input_data={"target": target, "verbose": verbose},
-            output_data=result
+            input_data_factory=lambda: {"target": target, "verbose": verbose},
+            output_data=self._compact_pytest_result(result),
+            success=success
         )
 
         return result
@@ -237,8 +368,20 @@ class ToolWrapper:
         return self.tools.get_sandbox_info()
 
     def validate_target_dir(self, target_dir: str) -> Dict[str, Any]:
-        """Validate a target directory without logging."""
-        return self.tools.validate_target_dir(target_dir)
+        """
+        Validate a target directory without logging.
+
+        A result is reused for VALIDATE_TTL seconds, so repeated checks of
+        the same directory do not stat it again.
+        """
+        now = time.monotonic()
+        cached = self._validations.get(target_dir)
+        if cached is not None and now - cached[0] < VALIDATE_TTL:
+            return dict(cached[1])
+
+        result = self.tools.validate_target_dir(target_dir)
+        self._validations[target_dir] = (now, dict(result))
+        return result
 
     def list_backups(self) -> Dict[str, Any]:
         """List available backups without logging."""
@@ -0,0 +1,108 @@
+"""
+Cache - Mémoïsation persistante des résultats coûteux (pylint, appels LLM)
+
+Les résultats sont stockés dans une base SQLite, indexés par un hash de tout
+ce qui les détermine (contenu du fichier, modèle, prompt, version de l'outil...).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+# Chemin de la base de cache
+CACHE_FILE = os.path.join(".cache", "swarm_cache.sqlite")
+
+
+def make_key(*parts: str) -> str:
+    """
+    Construit une clé de cache à partir des éléments qui déterminent un résultat.
+
+    Args:
+        *parts: Chaînes à hasher (nom de fonction, modèle, contenu...)
+
+    Returns:
+        Empreinte hexadécimale (blake2b)
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    Cache clé/valeur persistant (SQLite), partagé entre les threads.
+
+    Les valeurs doivent être sérialisables en JSON.
+    """
+
+    def __init__(self, path: str = CACHE_FILE):
+        """
+        Args:
+            path: Chemin du fichier SQLite (créé au premier accès)
+        """
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Ouvre la base (une seule fois) et crée la table si besoin."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            # WAL : plusieurs processus (exécutions parallèles du swarm) lisent pendant une écriture
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, "
+                "value TEXT NOT NULL, created REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+        return self._conn
+
+    def get(self, namespace: str, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """
+        Retourne la valeur stockée, ou None si absente.
+
+        max_age (secondes) : une entrée plus ancienne est ignorée, comme si elle était absente.
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value, created FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        """
+        Enregistre (ou remplace) une valeur.
+        """
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, created) "
+                "VALUES (?, ?, ?, ?)",
+                (namespace, key, payload, time.time()),
+            )
+            conn.commit()
+
+
+# Instance globale partagée par les agents
+_cache = None
+
+
+def get_cache() -> DiskCache:
+    """Get or create the global cache instance."""
+    global _cache
+    if _cache is None:
+        _cache = DiskCache()
+    return _cache
+
@@ -0,0 +1,31 @@
+"""
+Env - Chargement unique des variables d'environnement (.env)
+"""
+
+import os
+from functools import lru_cache
+from typing import Optional
+
+
+@lru_cache(maxsize=1)
+def load_env() -> None:
+    """
+    Charge le fichier .env une seule fois par processus.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def get_env(name: str) -> Optional[str]:
+    """
+    Lit une variable d'environnement après avoir chargé le .env (une seule fois).
+
+    Args:
+        name: Nom de la variable (ex: "MISTRAL_API_KEY")
+
+    Returns:
+        La valeur, ou None si absente
+    """
+    load_env()
+    return os.environ.get(name)
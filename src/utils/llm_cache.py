@@ -0,0 +1,96 @@
+"""
+LLM Cache - Réutilise les réponses des appels LLM déjà effectués
+
+Un prompt identique (même modèle, mêmes messages, mêmes paramètres) renvoie la
+réponse stockée dans le cache disque au lieu d'un nouvel appel réseau. Le prompt
+contient le template complet : modifier un fichier de prompt invalide donc le cache.
+"""
+
+import ast
+from typing import Callable, Dict, List, Optional, Tuple
+
+import orjson
+
+from src.utils.cache import get_cache, make_key
+
+# Espace de noms des réponses dans le cache disque
+NAMESPACE = "llm"
+
+# Approximation courante : ~4 caractères par token
+CHARS_PER_TOKEN = 4
+
+
+def cached_complete(client, model: str, messages: List[Dict], *,
+                    accept: Optional[Callable[[str], bool]] = None,
+                    **params) -> Tuple[str, bool]:
+    """
+    Appelle client.chat.complete, sauf si la même requête a déjà une réponse en cache.
+
+    Args:
+        client: Client Mistral
+        model: Nom du modèle
+        messages: Messages envoyés au modèle
+        accept: Si fourni, une réponse n'est mise en cache que si accept(réponse) est vrai
+        **params: Autres paramètres de chat.complete (response_format, temperature...)
+
+    Returns:
+        Tuple (texte de la réponse, True si servie par le cache)
+    """
+    cache = get_cache()
+    key = make_key(
+        model,
+        orjson.dumps(messages).decode(),
+        orjson.dumps(params, option=orjson.OPT_SORT_KEYS).decode(),
+    )
+
+    text = cache.get(NAMESPACE, key)
+    if text is not None:
+        return text, True
+
+    response = client.chat.complete(model=model, messages=messages, **params)
+    text = response.choices[0].message.content
+
+    if accept is None or accept(text):
+        cache.set(NAMESPACE, key, text)
+
+    return text, False
+
+
+def estimate_tokens(*texts: str) -> int:
+    """
+    Estimation grossière du nombre de tokens d'un ou plusieurs textes (prompt, réponse...)
+
+    Sert à chiffrer dans les logs ce qu'un appel servi par le cache a évité.
+    """
+    return sum(len(text) for text in texts) // CHARS_PER_TOKEN
+
+
+def structural_key(code: str) -> Optional[str]:
+    """
+    Empreinte de la structure d'un code Python, indépendante de la mise en forme,
+    des commentaires et des docstrings.
+
+    Deux fichiers qui ne diffèrent que par ces éléments ont la même empreinte : une
+    réponse générée pour l'un reste valable pour l'autre (mêmes noms, même logique).
+
+    Args:
+        code: Code source Python
+
+    Returns:
+        Empreinte hexadécimale, ou None si le code n'est pas analysable
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if (body and isinstance(body[0], ast.Expr)
+                    and isinstance(body[0].value, ast.Constant)
+                    and isinstance(body[0].value.value, str)):
+                node.body = body[1:] or [ast.Pass()]
+
+    # ast.dump ignore les positions (lignes, colonnes) par défaut
+    return make_key(ast.dump(tree))
@@ -0,0 +1,57 @@
+"""
+LLM Clients - Clients LLM partagés entre les agents
+"""
+
+import importlib.util
+from functools import lru_cache
+
+# Connexions gardées ouvertes : couvre les appels simultanés du Fixer et du TestGenerator
+MAX_KEEPALIVE_CONNECTIONS = 32
+MAX_CONNECTIONS = 64
+
+# Nouvelles tentatives sur erreurs transitoires (429, 5xx, connexion) : attente
+# exponentielle avec jitter, en millisecondes, abandon après RETRY_MAX_ELAPSED_MS
+RETRY_INITIAL_INTERVAL_MS = 500
+RETRY_MAX_INTERVAL_MS = 8000
+RETRY_MAX_ELAPSED_MS = 60000
+
+
+@lru_cache(maxsize=None)
+def get_mistral_client(api_key: str):
+    """
+    Client Mistral partagé par tous les agents utilisant la même clé (même pool HTTP)
+
+    Le pool httpx est dimensionné pour les appels parallèles des agents ; HTTP/2 est
+    activé si le paquet h2 est installé (plusieurs requêtes sur une même connexion).
+    Les erreurs transitoires de l'API sont retentées par le SDK avant de remonter
+    aux agents, au lieu de coûter une itération complète de la boucle.
+
+    Args:
+        api_key: Clé API Mistral
+
+    Returns:
+        Instance de mistralai.Mistral
+    """
+    # Import différé : le SDK (httpx, pydantic...) n'est chargé qu'au premier client
+    import httpx
+    from mistralai import Mistral
+    from mistralai.utils import BackoffStrategy, RetryConfig
+
+    http_client = httpx.Client(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            max_connections=MAX_CONNECTIONS,
+        ),
+    )
+    retry_config = RetryConfig(
+        "backoff",
+        BackoffStrategy(
+            initial_interval=RETRY_INITIAL_INTERVAL_MS,
+            max_interval=RETRY_MAX_INTERVAL_MS,
+            exponent=2.0,
+            max_elapsed_time=RETRY_MAX_ELAPSED_MS,
+        ),
+        retry_connection_errors=True,
+    )
+    return Mistral(api_key=api_key, client=http_client, retry_config=retry_config)
@@ -1,12 +1,23 @@
-import json
+import atexit
 import os
+import queue
+import threading
 import uuid
 from datetime import datetime
 from enum import Enum
 
+import orjson
+
 # Chemin du fichier de logs
 LOG_FILE = os.path.join("logs", "experiment_data.json")
 
+# Les entrées sont écrites par un thread dédié : log_experiment ne fait aucune
+# I/O disque sur le chemin critique des agents
+_queue = queue.SimpleQueue()
+_writer = None
+_writer_lock = threading.Lock()
+_atexit_registered = False
+
 
 class ActionType(str, Enum):
     """
@@ -57,9 +68,6 @@ def log_experiment(agent_name: str, model_used: str, action: ActionType, details
             )
 
     # --- 3. PRÉPARATION DE L'ENTRÉE ---
-    # Création du dossier logs s'il n'existe pas
-    os.makedirs("logs", exist_ok=True)
-    
     entry = {
         "id": str(uuid.uuid4()),  # ID unique pour éviter les doublons lors de la fusion des données
         "timestamp": datetime.now().isoformat(),
@@ -70,21 +78,99 @@ def log_experiment(agent_name: str, model_used: str, action: ActionType, details
         "status": status
     }
 
-    # --- 4. LECTURE & ÉCRITURE ROBUSTE ---
-    data = []
-    if os.path.exists(LOG_FILE):
+    # Sérialisé tout de suite (orjson, en C) : l'appelant peut modifier 'details' après l'appel.
+    # Les valeurs non JSON (Path...) sont écrites sous forme de texte.
+    serialized = b"  " + orjson.dumps(
+        entry, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+    ).replace(b"\n", b"\n  ")
+
+    # --- 4. ÉCRITURE EN ARRIÈRE-PLAN ---
+    _start_writer()
+    _queue.put(serialized)
+
+
+def _append_entries(entries: list) -> None:
+    """
+    Ajoute des entrées déjà sérialisées à la fin de la liste JSON du fichier de logs,
+    sans relire ni réécrire les entrées existantes.
+    """
+    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+    payload = b",\n".join(entries)
+
+    mode = 'r+b' if os.path.exists(LOG_FILE) else 'w+b'
+    with open(LOG_FILE, mode) as f:
+        size = f.seek(0, os.SEEK_END)
+        tail_start = max(0, size - 64)
+        f.seek(tail_start)
+        tail = f.read().rstrip()
+
+        if tail.endswith(b"]"):
+            # On se place juste avant le "]" final (et les blancs qui le précèdent)
+            before = tail[:-1].rstrip()
+            f.seek(tail_start + len(before))
+            f.truncate()
+            separator = b"\n" if before.endswith(b"[") else b",\n"
+            f.write(separator + payload + b"\n]")
+        else:
+            if size and tail:
+                # Si le fichier est corrompu, on repart à zéro (ou on pourrait sauvegarder un backup)
+                print(f"⚠️ Attention : Le fichier de logs {LOG_FILE} était corrompu. Une nouvelle liste a été créée.")
+            f.seek(0)
+            f.truncate()
+            f.write(b"[\n" + payload + b"\n]")
+
+
+def _writer_loop() -> None:
+    """
+    Thread d'écriture : regroupe les entrées en attente et les écrit en une fois.
+    """
+    while True:
+        entry = _queue.get()
+        if entry is None:
+            return
+
+        batch = [entry]
+        stop = False
+        while True:
+            try:
+                entry = _queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                stop = True
+                break
+            batch.append(entry)
+
         try:
-            with open(LOG_FILE, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                if content: # Vérifie que le fichier n'est pas juste vide
-                    data = json.loads(content)
-        except json.JSONDecodeError:
-            # Si le fichier est corrompu, on repart à zéro (ou on pourrait sauvegarder un backup)
-            print(f"⚠️ Attention : Le fichier de logs {LOG_FILE} était corrompu. Une nouvelle liste a été créée.")
-            data = []
-
-    data.append(entry)
-    
-    # Écriture
-    with open(LOG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
\ No newline at end of file
+            _append_entries(batch)
+        except OSError as e:
+            print(f"⚠️ Attention : Impossible d'écrire dans {LOG_FILE} : {e}")
+
+        if stop:
+            return
+
+
+def _start_writer() -> None:
+    """Démarre le thread d'écriture s'il ne tourne pas déjà."""
+    global _writer, _atexit_registered
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_writer_loop, name="experiment-logger", daemon=True)
+            _writer.start()
+            if not _atexit_registered:
+                atexit.register(flush_logs)
+                _atexit_registered = True
+
+
+def flush_logs() -> None:
+    """
+    Attend que toutes les entrées en attente soient écrites dans le fichier de logs.
+
+    Appelée automatiquement à la sortie du programme.
+    """
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        _queue.put(None)
+        writer.join()
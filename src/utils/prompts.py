@@ -0,0 +1,30 @@
+"""
+Prompts - Chargement des prompts des agents (src/prompts/*.txt)
+"""
+
+from functools import lru_cache
+from pathlib import Path
+
+# Dossier des fichiers de prompts
+PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
+
+
+@lru_cache(maxsize=None)
+def load_prompt(filename: str) -> str:
+    """
+    Charge un prompt depuis src/prompts (lu une seule fois par processus)
+
+    Args:
+        filename: Nom du fichier (ex: "fixer_prompt.txt")
+
+    Returns:
+        Contenu du prompt
+    """
+    prompt_path = PROMPTS_DIR / filename
+
+    if not prompt_path.exists():
+        raise FileNotFoundError(
+            f"{filename} not found in: {prompt_path}"
+        )
+
+    return prompt_path.read_text(encoding="utf-8")
@@ -0,0 +1,23 @@
+"""
+Text - Nettoyage des réponses texte renvoyées par les LLM
+"""
+
+import re
+
+# Premier bloc markdown (```python ... ``` ou ``` ... ```), fermeture optionnelle.
+# Les blancs autour du code sont exclus de la capture : pas de .strip() ensuite.
+_CODE_FENCE_RE = re.compile(r"```(?:python)?[^\n]*\n?\s*(.*?)\s*(?:```|\Z)", re.DOTALL)
+
+
+def strip_code_fence(text: str) -> str:
+    """
+    Extrait le code d'un bloc markdown en un seul passage
+
+    Args:
+        text: Réponse brute du modèle
+
+    Returns:
+        Contenu du premier bloc de code, ou le texte entier s'il n'y en a pas
+    """
+    match = _CODE_FENCE_RE.search(text)
+    return match.group(1) if match else text.strip()